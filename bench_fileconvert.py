@@ -0,0 +1,524 @@
+import argparse
+import csv
+import fnmatch
+import json
+import os
+import platform
+import shutil
+import tempfile
+import tracemalloc
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Everything fileconvert used to import and probe at module load.
+EAGER_IMPORTS = """
+import fileconvert
+from PIL import Image
+import fitz, docx2pdf, pandas, PyPDF2, pdf2image, pdfkit, rarfile, py7zr
+from docx import Document
+from pdf2docx import Converter
+from moviepy.editor import VideoFileClip
+fileconvert.check_ffmpeg()
+fileconvert.check_command("pandoc")
+fileconvert.check_command("ebook-convert")
+"""
+
+
+def time_python(code, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=HERE, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def bench_startup(args):
+    lazy = time_python("import fileconvert", args.repeat)
+    try:
+        eager = time_python(EAGER_IMPORTS, args.repeat)
+    except subprocess.CalledProcessError:
+        eager = None
+    print(f"import fileconvert (lazy):      {lazy * 1000:8.1f} ms")
+    if eager is None:
+        print("eager backend import:          skipped (backend missing)")
+    else:
+        print(f"eager backend import + probes: {eager * 1000:8.1f} ms ({eager / lazy:.1f}x slower)")
+
+
+def traced_peak(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    duration = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return duration, peak
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "email", "score"])
+        for i in range(rows):
+            writer.writerow([i, f"user{i}", f"user{i}@example.com", i * 0.5])
+
+
+def bench_memory(args):
+    # Goes through convert_file so the numbers reflect the converter the
+    # registry actually picks for each pair.
+    import fileconvert
+
+    print(f"{'rows':>10} {'conversion':<14} {'converter':<14} {'seconds':>8} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            csv_path = os.path.join(tmp, "in.csv")
+            json_path = os.path.join(tmp, "out.json")
+            ndjson_path = os.path.join(tmp, "out.ndjson")
+            back_path = os.path.join(tmp, "back.csv")
+            write_csv(csv_path, rows)
+            cases = [
+                ("csv->json", csv_path, json_path),
+                ("csv->ndjson", csv_path, ndjson_path),
+                ("json->csv", json_path, back_path),
+                ("ndjson->csv", ndjson_path, back_path),
+            ]
+            for name, src, dst in cases:
+                input_ext, output_ext = (os.path.splitext(path)[1] for path in (src, dst))
+                converter = fileconvert.find_converter(input_ext, output_ext)["func"].__name__
+                duration, peak = traced_peak(fileconvert.convert_file, src, dst)
+                print(f"{rows:>10} {name:<14} {converter:<14} {duration:8.2f} {peak / 2**20:9.2f}")
+
+
+def run_isolated(code):
+    # Runs code in a fresh interpreter so peak RSS belongs to that job alone.
+    # The snippet must leave its result dict in `result`.
+    wrapper = (
+        "import json, time, fileconvert\n"
+        "start = time.perf_counter()\n"
+        f"{code}\n"
+        "result = dict(duration=time.perf_counter() - start, peak_rss=fileconvert._peak_rss())\n"
+        "print(json.dumps(result))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", wrapper], cwd=HERE, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def bench_images_to_pdf(args):
+    from PIL import Image
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for i in range(args.count):
+            path = os.path.join(tmp, f"scan{i}{args.format}")
+            Image.effect_noise((args.width, args.height), 64).convert("RGB").save(path)
+            files.append(path)
+        output = os.path.join(tmp, "out.pdf")
+        print(f"{args.count} {args.width}x{args.height} {args.format} images")
+        print(f"{'mode':<12} {'seconds':>8} {'pages/s':>8} {'peak MiB':>9}")
+        for mode in ("pil", "incremental"):
+            code = f"fileconvert.images_to_pdf({files!r}, {output!r}, incremental={mode == 'incremental'})"
+            result = run_isolated(code)
+            print(f"{mode:<12} {result['duration']:8.2f} {args.count / result['duration']:8.1f} "
+                  f"{result['peak_rss'] / 2**20:9.1f}")
+
+
+MOVIEPY_EXTRACT = """
+from moviepy.editor import VideoFileClip
+video = VideoFileClip({video!r})
+video.audio.write_audiofile({audio!r}, codec={codec!r}, logger=None)
+video.close()
+"""
+
+
+def bench_extract_audio(args):
+    import fileconvert
+
+    ffmpeg = fileconvert.ffmpeg_executable()
+    if ffmpeg is None:
+        print("skipped: ffmpeg is not available")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        video = os.path.join(tmp, "long.mp4")
+        subprocess.run(
+            [ffmpeg, "-y", "-loglevel", "error", "-f", "lavfi", "-i", "testsrc=size=1280x720:rate=30",
+             "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=44100", "-t", str(args.seconds),
+             "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", "-shortest", video],
+            check=True,
+        )
+        print(f"{args.seconds}s 720p video")
+        print(f"{'path':<30} {'seconds':>8} {'peak MiB':>9}")
+        for ext in (".m4a", ".mp3"):
+            audio = os.path.join(tmp, "out" + ext)
+            cases = [
+                ("moviepy", MOVIEPY_EXTRACT.format(video=video, audio=audio, codec="aac" if ext == ".m4a" else None)),
+                ("extract_audio_from_video", f"fileconvert.extract_audio_from_video({video!r}, {audio!r})"),
+            ]
+            for name, code in cases:
+                result = run_isolated(code)
+                print(f"{name + ' ' + ext:<30} {result['duration']:8.2f} {result['peak_rss'] / 2**20:9.1f}")
+
+
+def bench_compress(args):
+    import fileconvert
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "tree")
+        for i in range(args.files):
+            directory = os.path.join(source, f"d{i // 1000}")
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"f{i}.txt"), "w") as f:
+                f.write(f"record {i}\n" * (args.size // 10))
+        print(f"{args.files} files of ~{args.size} bytes")
+        print(f"{'level':>8} {'seconds':>8} {'MiB/s':>8} {'ratio':>8}")
+        for level in args.levels:
+            stats = fileconvert.compress_zip(source, os.path.join(tmp, "out.zip"), compresslevel=level)
+            ratio = stats["bytes_in"] / stats["bytes_out"]
+            print(f"{level:>8} {stats['duration']:8.2f} {stats['bytes_per_second'] / 2**20:8.1f} {ratio:8.2f}")
+
+
+# Synthetic input scale per size; each generator multiplies its base amount.
+SUITE_SIZES = {"small": 1, "medium": 10, "large": 100}
+
+TABLE_EXTENSIONS = (".csv", ".json", ".ndjson", ".jsonl", ".yaml", ".xlsx", ".xml", ".parquet", ".feather", ".arrow")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tiff", ".webp")
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".flv", ".wmv", ".webm")
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".ogg", ".flac", ".aac", ".m4a", ".wma")
+
+TEXT = "The quick brown fox jumps over the lazy dog. " * 4
+
+
+def table_records(rows):
+    return [{"id": i, "name": f"user{i}", "email": f"user{i}@example.com", "score": i * 0.5} for i in range(rows)]
+
+
+def make_table(path, ext, scale):
+    rows = 1000 * scale
+    if ext == ".csv":
+        write_csv(path, rows)
+    elif ext == ".json":
+        with open(path, "w") as f:
+            json.dump(table_records(rows), f)
+    elif ext in (".ndjson", ".jsonl"):
+        with open(path, "w") as f:
+            for record in table_records(rows):
+                f.write(json.dumps(record) + "\n")
+    elif ext == ".yaml":
+        import yaml
+
+        with open(path, "w") as f:
+            yaml.safe_dump(table_records(rows), f)
+    elif ext == ".xlsx":
+        import openpyxl
+
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(["id", "name", "email", "score"])
+        for record in table_records(rows):
+            sheet.append(list(record.values()))
+        workbook.save(path)
+    elif ext == ".xml":
+        with open(path, "w") as f:
+            f.write("<records>\n")
+            for record in table_records(rows):
+                fields = "".join(f"<{key}>{value}</{key}>" for key, value in record.items())
+                f.write(f"  <record>{fields}</record>\n")
+            f.write("</records>\n")
+    elif ext == ".parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        pq.write_table(pa.Table.from_pylist(table_records(rows)), path)
+    elif ext in (".feather", ".arrow"):
+        import pyarrow as pa
+        import pyarrow.feather
+
+        pyarrow.feather.write_feather(pa.Table.from_pylist(table_records(rows)), path)
+
+
+def make_pdf(path, scale):
+    from reportlab.pdfgen import canvas
+
+    c = canvas.Canvas(path)
+    for page in range(2 * scale):
+        for line in range(40):
+            c.drawString(50, 800 - line * 18, f"Page {page} line {line}: {TEXT[:80]}")
+        c.showPage()
+    c.save()
+
+
+def make_image(path, scale):
+    from PIL import Image
+
+    side = int(512 * scale ** 0.5)
+    Image.effect_noise((side, side), 64).convert("RGB").save(path)
+
+
+def make_markdown(scale):
+    sections = []
+    for i in range(50 * scale):
+        sections.append(f"## Section {i}\n\n{TEXT}\n\n- item one\n- item *two*\n")
+    return "# Benchmark\n\n" + "\n".join(sections)
+
+
+def make_media(path, ext, scale, ffmpeg):
+    inputs = ["-f", "lavfi", "-i", "sine=frequency=440:sample_rate=44100"]
+    if ext in VIDEO_EXTENSIONS:
+        inputs = ["-f", "lavfi", "-i", "testsrc=size=320x240:rate=25"] + inputs
+    subprocess.run([ffmpeg, "-y", "-loglevel", "error", *inputs, "-t", str(2 * scale), "-shortest", path],
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def make_input(ext, path, scale, tmp):
+    # Writes a synthetic input at path and returns None, or returns the reason
+    # no input can be made here.
+    import fileconvert
+
+    if ext in TABLE_EXTENSIONS:
+        make_table(path, ext, scale)
+    elif ext == ".pdf":
+        make_pdf(path, scale)
+    elif ext in IMAGE_EXTENSIONS:
+        make_image(path, scale)
+    elif ext == ".svg":
+        with open(path, "w") as f:
+            f.write('<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400">')
+            f.writelines(f'<circle cx="{i % 400}" cy="{i * 7 % 400}" r="5"/>' for i in range(100 * scale))
+            f.write("</svg>")
+    elif ext in (".md", ".txt"):
+        with open(path, "w") as f:
+            f.write(make_markdown(scale))
+    elif ext == ".html":
+        import markdown
+
+        with open(path, "w") as f:
+            f.write(f"<html><body>{markdown.markdown(make_markdown(scale))}</body></html>")
+    elif ext == ".rtf":
+        with open(path, "w") as f:
+            f.write("{\\rtf1\\ansi " + "\\par ".join(TEXT for _ in range(50 * scale)) + "}")
+    elif ext == ".docx":
+        from docx import Document
+
+        doc = Document()
+        for i in range(50 * scale):
+            doc.add_heading(f"Section {i}", level=2)
+            doc.add_paragraph(TEXT)
+        doc.save(path)
+    elif ext == ".epub":
+        if not shutil.which("pandoc"):
+            return "pandoc is needed to build an EPUB input"
+        source = os.path.join(tmp, "epub-source.md")
+        with open(source, "w") as f:
+            f.write(make_markdown(scale))
+        subprocess.run(["pandoc", source, "-o", path], check=True)
+    elif ext in VIDEO_EXTENSIONS or ext in AUDIO_EXTENSIONS:
+        ffmpeg = fileconvert.ffmpeg_executable()
+        if ffmpeg is None:
+            return "ffmpeg is needed to build media inputs"
+        try:
+            make_media(path, ext, scale, ffmpeg)
+        except subprocess.CalledProcessError:
+            return f"this ffmpeg cannot write {ext}"
+    elif ext in (".zip", ".7z", ".rar"):
+        source = os.path.join(tmp, "archive-source")
+        os.makedirs(source, exist_ok=True)
+        for i in range(20 * scale):
+            with open(os.path.join(source, f"file{i}.txt"), "w") as f:
+                f.write(TEXT * 20)
+        compress = {".zip": fileconvert.compress_zip, ".7z": fileconvert.compress_7z, ".rar": fileconvert.compress_rar}
+        try:
+            compress[ext](source, path)
+        except ValueError as e:
+            return str(e)
+    else:
+        return f"no synthetic {ext} input"
+    return None
+
+
+SUITE_RUN = """
+import json, logging, os, shutil, fileconvert
+logging.disable(logging.CRITICAL)
+records = []
+for _ in range({runs}):
+    if os.path.isdir({output!r}):
+        shutil.rmtree({output!r})
+    elif os.path.exists({output!r}):
+        os.remove({output!r})
+    records.append(fileconvert.convert_file({input!r}, {output!r}, metrics=True))
+print(json.dumps(records))
+"""
+
+
+def suite_pairs(patterns):
+    import fileconvert
+
+    pairs = []
+    for input_ext, output_ext in sorted(fileconvert._CONVERTERS):
+        if input_ext == output_ext:
+            continue
+        # Wildcard pairs are the archive converters: compress a text file,
+        # extract into a directory.
+        name = f"{input_ext}->{output_ext}"
+        if patterns and not any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+            continue
+        pairs.append((input_ext, output_ext))
+    return pairs
+
+
+def run_pair(input_ext, output_ext, size, args, tmp):
+    import fileconvert
+
+    pair = f"{input_ext}->{output_ext}"
+    result = {"pair": pair, "size": size, "status": "ok", "reason": None}
+    source_ext = ".txt" if input_ext == "*" else input_ext
+    converter = fileconvert.find_converter(source_ext, "" if output_ext == "*" else output_ext)
+    if converter is None or not fileconvert.backend_available(converter["backend"]):
+        backend = converter["backend"] if converter else None
+        result.update(status="skipped", reason=f"backend {backend} is not available")
+        return result
+    result["backend"] = converter["backend"]
+
+    source = os.path.join(tmp, f"input-{size}{source_ext}")
+    if not os.path.exists(source):
+        reason = make_input(source_ext, source, SUITE_SIZES[size], tmp)
+        if reason:
+            result.update(status="skipped", reason=reason)
+            return result
+    output = os.path.join(tmp, "output" if output_ext == "*" else "output" + output_ext)
+    code = SUITE_RUN.format(runs=args.repeat + 1, input=source, output=output)
+    try:
+        completed = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True,
+                                   timeout=args.timeout)
+    except subprocess.TimeoutExpired:
+        result.update(status="failed", reason=f"timed out after {args.timeout}s")
+        return result
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines()
+        result.update(status="failed", reason=lines[-1] if lines else f"exit status {completed.returncode}")
+        return result
+
+    # The first run pays for imports and tool start-up and is reported apart.
+    cold, *runs = json.loads(completed.stdout.splitlines()[-1])
+    latencies = [record["wall_time"] for record in runs]
+    latency = statistics.median(latencies)
+    result.update(
+        input_bytes=cold["input_bytes"],
+        cold_latency=cold["wall_time"],
+        latency_p50=latency,
+        latency_min=min(latencies),
+        cpu_p50=statistics.median(record["cpu_time"] for record in runs),
+        throughput=cold["input_bytes"] / latency if cold["input_bytes"] and latency else None,
+        peak_rss=max(record["peak_rss"] or 0 for record in runs),
+    )
+    return result
+
+
+def compare_suite(results, baseline, threshold):
+    # Returns the keys whose latency or peak memory grew past threshold.
+    old = {f"{r['pair']} {r['size']}": r for r in baseline["results"] if r["status"] == "ok"}
+    regressions = []
+    print(f"\n{'pair':<18} {'size':<7} {'p50 ratio':>9} {'RSS ratio':>9}")
+    for result in results:
+        key = f"{result['pair']} {result['size']}"
+        if result["status"] != "ok" or key not in old:
+            continue
+        latency = result["latency_p50"] / old[key]["latency_p50"] if old[key]["latency_p50"] else 1.0
+        memory = result["peak_rss"] / old[key]["peak_rss"] if old[key]["peak_rss"] else 1.0
+        flag = ""
+        if latency > threshold or memory > threshold:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(f"{result['pair']:<18} {result['size']:<7} {latency:9.2f} {memory:9.2f}{flag}")
+    return regressions
+
+
+def bench_suite(args):
+    import fileconvert
+
+    results = []
+    print(f"{'pair':<18} {'size':<7} {'p50 ms':>9} {'cold ms':>9} {'MiB/s':>8} {'peak MiB':>9}  status")
+    with tempfile.TemporaryDirectory() as tmp:
+        for input_ext, output_ext in suite_pairs(args.pairs):
+            for size in args.sizes:
+                result = run_pair(input_ext, output_ext, size, args, tmp)
+                results.append(result)
+                if result["status"] == "ok":
+                    throughput = f"{result['throughput'] / 2**20:8.2f}" if result["throughput"] else f"{'-':>8}"
+                    print(f"{result['pair']:<18} {size:<7} {result['latency_p50'] * 1000:9.1f} "
+                          f"{result['cold_latency'] * 1000:9.1f} {throughput} {result['peak_rss'] / 2**20:9.1f}  ok")
+                else:
+                    print(f"{result['pair']:<18} {size:<7} {'':>9} {'':>9} {'':>8} {'':>9}  "
+                          f"{result['status']}: {result['reason']}")
+
+    backends = sorted({r["backend"] for r in results if r.get("backend")})
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backends": {backend: fileconvert.backend_version(backend) for backend in backends},
+        },
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_suite(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.2f}x")
+            sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fileconvert benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    startup = subparsers.add_parser("startup", help="module import time, lazy vs eager backends")
+    startup.add_argument("--repeat", type=int, default=5)
+    startup.set_defaults(func=bench_startup)
+
+    memory = subparsers.add_parser("memory", help="peak memory of the streaming CSV/JSON converters")
+    memory.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    memory.set_defaults(func=bench_memory)
+
+    images = subparsers.add_parser("images-to-pdf", help="PIL save_all vs incremental PDF assembly")
+    images.add_argument("--count", type=int, default=200)
+    images.add_argument("--width", type=int, default=1700)
+    images.add_argument("--height", type=int, default=2200)
+    images.add_argument("--format", default=".jpg", choices=[".jpg", ".png", ".tiff"])
+    images.set_defaults(func=bench_images_to_pdf)
+
+    extract = subparsers.add_parser("extract-audio", help="moviepy vs ffmpeg stream-copy audio extraction")
+    extract.add_argument("--seconds", type=int, default=600)
+    extract.set_defaults(func=bench_extract_audio)
+
+    compress = subparsers.add_parser("compress", help="zip a directory tree at several compression levels")
+    compress.add_argument("--files", type=int, default=20_000)
+    compress.add_argument("--size", type=int, default=4096)
+    compress.add_argument("--levels", type=int, nargs="+", default=[1, 6, 9])
+    compress.set_defaults(func=bench_compress)
+
+    suite = subparsers.add_parser("suite", help="latency, throughput and peak memory of every registered pair")
+    suite.add_argument("--pairs", nargs="+", help="glob patterns such as '.csv->*' (default: all)")
+    suite.add_argument("--sizes", nargs="+", choices=list(SUITE_SIZES), default=["small", "medium"])
+    suite.add_argument("--repeat", type=int, default=3, help="measured runs after one cold run")
+    suite.add_argument("--timeout", type=int, default=300, help="seconds per pair and size")
+    suite.add_argument("--save", help="write results as a JSON baseline")
+    suite.add_argument("--compare", help="baseline JSON to compare against")
+    suite.add_argument("--threshold", type=float, default=1.25, help="ratio that counts as a regression")
+    suite.set_defaults(func=bench_suite)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
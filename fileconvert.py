@@ -1,34 +1,36 @@
 import os
-from PIL import Image
-import fitz
-import docx2pdf
 import csv
 import json
+import re
 import yaml
-import pandas as pd
 import xml.etree.ElementTree as ET
 import subprocess
-from docx import Document
-from PyPDF2 import PdfReader
-import markdown
 import zipfile
-import rarfile
-import py7zr
-import pdf2image
-from pdf2docx import Converter
-import pdfkit
-from moviepy.editor import VideoFileClip
+from functools import lru_cache
 from typing import Dict, List
 import logging
-import pkg_resources
+import signal
+import sys
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from contextlib import contextmanager
+
+# Conversion backends (PIL, fitz, pandas, moviepy, ...) are imported inside the
+# converters that use them, so importing this module only pays for what a job
+# actually touches.
 
 def get_project_requirements():
+    import pkg_resources
+
     with open('requirements.txt', 'w') as f:
         for package in pkg_resources.working_set:
             f.write(f"{package.key}=={package.version}\n")
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+@lru_cache(maxsize=None)
 def check_ffmpeg():
     try:
         subprocess.run(
@@ -42,41 +44,142 @@ def check_ffmpeg():
         return False
 
 
-ffmpeg_available = check_ffmpeg()
+@lru_cache(maxsize=None)
+def ffmpeg_executable():
+    # A system ffmpeg first, then the static build moviepy pulls in through
+    # imageio-ffmpeg.
+    if check_ffmpeg():
+        return "ffmpeg"
+    try:
+        import imageio_ffmpeg
+
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except (ImportError, RuntimeError):
+        return None
+
+
+_LAZY_PROBES = {
+    "ffmpeg_available": check_ffmpeg,
+    "pandoc_available": lambda: check_command("pandoc"),
+    "calibre_available": lambda: check_command("ebook-convert"),
+}
 
-if ffmpeg_available:
-    import ffmpeg
-    from pydub import AudioSegment
+
+def __getattr__(name):
+    # Keeps the old module-level flags working without probing at import time.
+    if name in _LAZY_PROBES:
+        return _LAZY_PROBES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def excel_to_csv(excel_file, csv_file):
+    import pandas as pd
+
     df = pd.read_excel(excel_file)
     df.to_csv(csv_file, index=False)
 
 
 def csv_to_excel(csv_file, excel_file):
+    import pandas as pd
+
     df = pd.read_csv(csv_file)
     df.to_excel(excel_file, index=False)
 
 
-def csv_to_json(csv_file, json_file):
-    with open(csv_file, "r") as csvfile:
-        reader = csv.DictReader(csvfile)
-        data = list(reader)
+def _write_json_records(records, fp, ndjson=False, indent=4, default=None):
+    # Writes the same bytes json.dump(list(records), fp, indent=indent) would,
+    # one record at a time.
+    if ndjson:
+        for record in records:
+            fp.write(json.dumps(record, default=default))
+            fp.write("\n")
+        return
 
-    with open(json_file, "w") as jsonfile:
-        json.dump(data, jsonfile, indent=4)
+    pad = " " * indent
+    empty = True
+    for record in records:
+        fp.write("[\n" if empty else ",\n")
+        fp.write(pad + json.dumps(record, indent=indent, default=default).replace("\n", "\n" + pad))
+        empty = False
+    fp.write("[]" if empty else "\n]")
 
 
-def json_to_csv(json_file, csv_file):
-    with open(json_file, "r") as jsonfile:
-        data = json.load(jsonfile)
+_JSON_SEPARATORS = re.compile(r"[\s,]*")
 
-    with open(csv_file, "w", newline="") as csvfile:
-        if data:
-            writer = csv.DictWriter(csvfile, fieldnames=data[0].keys())
-            writer.writeheader()
-            writer.writerows(data)
+
+def _iter_json_records(fp, chunk_size=1 << 16):
+    # Incrementally decodes either a top-level JSON array or NDJSON, reading
+    # chunk_size characters at a time.
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    in_array = None
+    while True:
+        pos = _JSON_SEPARATORS.match(buffer, pos).end()
+        if pos < len(buffer):
+            if in_array is None:
+                in_array = buffer[pos] == "["
+                if in_array:
+                    pos += 1
+                    continue
+            if in_array and buffer[pos] == "]":
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A value touching the end of the buffer may be a truncated
+                # number or literal, so only trust it once more data is read.
+                if end < len(buffer) or eof:
+                    pos = end
+                    yield record
+                    continue
+        elif eof:
+            return
+
+        chunk = fp.read(chunk_size)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        eof = not chunk
+
+
+def csv_to_json(csv_file, json_file, ndjson=False):
+    with open(csv_file, "r") as csvfile, open(json_file, "w") as jsonfile:
+        reader = csv.DictReader(csvfile)
+        if reader.fieldnames is None:
+            raise ValueError(f"No columns to parse from {csv_file}")
+        _write_json_records(reader, jsonfile, ndjson=ndjson)
+
+
+def csv_to_ndjson(csv_file, ndjson_file):
+    csv_to_json(csv_file, ndjson_file, ndjson=True)
+
+
+def json_to_csv(json_file, csv_file, fieldnames=None, sample=1000):
+    # Columns are fieldnames when given, else the union of the keys in the
+    # first sample records; missing keys are left empty and keys that only
+    # show up later are dropped with a warning.
+    import itertools
+
+    with open(json_file, "r") as jsonfile, open(csv_file, "w", newline="") as csvfile:
+        records = _iter_json_records(jsonfile)
+        head = list(itertools.islice(records, sample))
+        if fieldnames is None:
+            fieldnames = list(dict.fromkeys(key for record in head for key in record))
+        if not fieldnames:
+            return
+        known = set(fieldnames)
+        warned = False
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        for record in itertools.chain(head, records):
+            if not warned and not known.issuperset(record):
+                logging.warning(f"Dropping JSON fields missing from the CSV header: {sorted(set(record) - known)}")
+                warned = True
+            writer.writerow(record)
 
 
 def json_to_yaml(json_file, yaml_file):
@@ -96,94 +199,1037 @@ def yaml_to_json(yaml_file, json_file):
 
 
 def word_to_pdf(docx_file, pdf_file):
+    import docx2pdf
+
     docx2pdf.convert(docx_file, pdf_file)
 
 
-def pdf_to_text(pdf_file, txt_file):
+def _split_evenly(items, parts):
+    size, extra = divmod(len(items), parts)
+    start = 0
+    for part in range(parts):
+        end = start + size + (part < extra)
+        if end > start:
+            yield items[start:end]
+        start = end
+
+
+def _pdf_page_count(pdf_file, backend):
+    if backend == "pymupdf":
+        import fitz
+
+        with fitz.open(pdf_file) as doc:
+            return doc.page_count
+    from PyPDF2 import PdfReader
+
     with open(pdf_file, "rb") as file:
-        reader = PdfReader(file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
+        return len(PdfReader(file).pages)
 
-    with open(txt_file, "w", encoding="utf-8") as file:
-        file.write(text)
+
+def _extract_pdf_text(pdf_file, start, end, txt_file, backend):
+    # Each page is written as soon as it is extracted.
+    with open(txt_file, "w", encoding="utf-8") as out:
+        if backend == "pymupdf":
+            import fitz
+
+            with fitz.open(pdf_file) as doc:
+                for number in range(start, end):
+                    out.write(doc.load_page(number).get_text() + "\n")
+        else:
+            from PyPDF2 import PdfReader
+
+            with open(pdf_file, "rb") as file:
+                reader = PdfReader(file)
+                for number in range(start, end):
+                    out.write((reader.pages[number].extract_text() or "") + "\n")
+
+
+def pdf_to_text(pdf_file, txt_file, backend="pypdf2", workers=1):
+    if backend not in ("pypdf2", "pymupdf"):
+        raise ValueError(f"Unknown PDF text backend: {backend}")
+    page_count = _pdf_page_count(pdf_file, backend)
+    if workers <= 1 or page_count < 2:
+        _extract_pdf_text(pdf_file, 0, page_count, txt_file, backend)
+        return
+
+    import shutil
+    import tempfile
+
+    shards = [(shard[0], shard[-1] + 1) for shard in _split_evenly(list(range(page_count)), workers)]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        parts = [os.path.join(temp_dir, f"{start}.txt") for start, _ in shards]
+        with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+            futures = [
+                executor.submit(_extract_pdf_text, pdf_file, start, end, part, backend)
+                for (start, end), part in zip(shards, parts)
+            ]
+            for future in futures:
+                future.result()
+        with open(txt_file, "wb") as out:
+            for part in parts:
+                with open(part, "rb") as file:
+                    shutil.copyfileobj(file, out)
 
 
 def text_to_word(txt_file, docx_file):
+    from docx import Document
+
     doc = Document()
     with open(txt_file, "r", encoding="utf-8") as file:
         doc.add_paragraph(file.read())
     doc.save(docx_file)
 
 
-def convert_image(input_path, output_path):
+def _save_image(img, output_path, max_size=None, quality=None, optimize=False, progressive=False):
+    if max_size:
+        # thumbnail() asks JPEG decoders for a draft at a reduced scale and
+        # uses reduce() before resampling, so big downscales stay cheap.
+        img.thumbnail(max_size)
+    if output_path.lower().endswith(".pdf"):
+        img.save(output_path, "PDF", resolution=100.0)
+        return
+    options = {}
+    if quality is not None:
+        options["quality"] = quality
+    if optimize:
+        options["optimize"] = True
+    if progressive:
+        options["progressive"] = True
+    if output_path.lower().endswith((".jpg", ".jpeg")) and img.mode not in ("RGB", "L", "CMYK"):
+        img = img.convert("RGB")
+    img.save(output_path, **options)
+
+
+def convert_image(input_path, output_path, max_size=None, quality=None, optimize=False, progressive=False):
+    from PIL import Image
+
     with Image.open(input_path) as img:
-        if output_path.lower().endswith(".pdf"):
-            img.save(output_path, "PDF", resolution=100.0)
-        else:
-            img.save(output_path)
+        _save_image(img, output_path, max_size, quality, optimize, progressive)
 
 
-def convert_pdf_to_image(input_path, output_path):
-    images = pdf2image.convert_from_path(input_path)
-    if images:
-        # Save only the first page if the output is a single image file
-        images[0].save(output_path)
-    else:
-        raise ValueError("No images extracted from the PDF")
+def _convert_image_job(input_path, targets):
+    from PIL import Image
+
+    result = {"input": input_path, "outputs": [], "status": "ok", "error": None, "duration": 0.0}
+    start = time.perf_counter()
+    try:
+        with Image.open(input_path) as img:
+            sizes = [options.get("max_size") for _, options in targets]
+            if len(targets) > 1 and all(sizes):
+                # Decode once at the smallest draft scale every target can use.
+                img.draft(None, (max(size[0] for size in sizes), max(size[1] for size in sizes)))
+            for output_path, options in targets:
+                _save_image(img.copy() if len(targets) > 1 else img, output_path, **options)
+                result["outputs"].append(output_path)
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+    result["duration"] = time.perf_counter() - start
+    return result
+
+
+# Each spec is a dict with optional keys format (".webp"), suffix ("_thumb"),
+# max_size ((w, h)), quality, optimize and progressive. Every input is written
+# once per spec to output_dir/<stem><suffix><format>.
+def convert_images(input_paths, output_dir, specs, workers=None, max_in_flight=None):
+    jobs = []
+    for input_path in input_paths:
+        stem, ext = os.path.splitext(os.path.basename(input_path))
+        targets = []
+        for spec in specs:
+            options = {key: value for key, value in spec.items() if key not in ("format", "suffix")}
+            output_path = os.path.join(output_dir, f"{stem}{spec.get('suffix', '')}{spec.get('format', ext)}")
+            targets.append((output_path, options))
+        jobs.append((input_path, targets))
+
+    start = time.perf_counter()
+    results = [None] * len(jobs)
+    for index, result in _run_jobs(_convert_image_job, jobs, workers, max_in_flight):
+        results[index] = result
+    duration = time.perf_counter() - start
+
+    converted = sum(1 for result in results if result["status"] == "ok")
+    return {
+        "results": results,
+        "images": converted,
+        "outputs": sum(len(result["outputs"]) for result in results),
+        "duration": duration,
+        "images_per_second": converted / duration if duration else 0.0,
+    }
 
 
-def convert_pdf(input_path, output_path):
-    doc = fitz.open(input_path)
-    if output_path.lower().endswith((".png", ".jpg", ".jpeg", ".tiff")):
-        page = doc.load_page(0)
-        pix = page.get_pixmap()
-        pix.save(output_path)
+def _parse_pages(pages, page_count):
+    # None means the first page only. Integers and iterables are 0-based page
+    # numbers; strings are 1-based ranges such as "1-3,7" or "all".
+    if pages is None:
+        return [0]
+    if isinstance(pages, int):
+        numbers = [pages]
+    elif isinstance(pages, str):
+        if pages.strip().lower() == "all":
+            return list(range(page_count))
+        numbers = []
+        for part in pages.split(","):
+            start, _, end = part.strip().partition("-")
+            numbers.extend(range(int(start) - 1, int(end or start)))
     else:
-        doc.save(output_path)
-    doc.close()
+        numbers = list(pages)
+    for number in numbers:
+        if not 0 <= number < page_count:
+            raise ValueError(f"Page {number + 1} is out of range (document has {page_count} pages)")
+    return numbers
 
 
-def convert_video(input_path, output_path):
-    if ffmpeg_available:
-        stream = ffmpeg.input(input_path)
-        stream = ffmpeg.output(stream, output_path)
-        ffmpeg.run(stream)
-    else:
+def _page_output_paths(output_path, page_numbers, page_count):
+    if len(page_numbers) == 1:
+        return [output_path]
+    stem, ext = os.path.splitext(output_path)
+    width = len(str(page_count))
+    return [f"{stem}-{number + 1:0{width}d}{ext}" for number in page_numbers]
+
+
+def _render_pdf_pages(input_path, page_numbers, output_paths, dpi=None):
+    import fitz
+
+    with fitz.open(input_path) as doc:
+        for number, path in zip(page_numbers, output_paths):
+            pix = doc.load_page(number).get_pixmap(dpi=dpi)
+            if path.lower().endswith((".png", ".jpg", ".jpeg")):
+                pix.save(path)
+            else:
+                pix.pil_save(path)
+
+
+def _write_multipage_tiff(page_files, output_path):
+    from PIL import Image, TiffImagePlugin
+
+    # AppendingTiffWriter keeps one decoded page in memory at a time.
+    with TiffImagePlugin.AppendingTiffWriter(output_path, True) as tiff:
+        for path in page_files:
+            with Image.open(path) as page:
+                page.save(tiff, "TIFF")
+            tiff.newFrame()
+
+
+def _rasterize_pdf(render, input_path, output_path, page_numbers, page_count, multipage):
+    import shutil
+    import tempfile
+
+    if not multipage:
+        output_paths = _page_output_paths(output_path, page_numbers, page_count)
+        render(page_numbers, output_paths)
+        return output_paths
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        page_files = [os.path.join(temp_dir, f"{number}.png") for number in page_numbers]
+        render(page_numbers, page_files)
+        _write_multipage_tiff(page_files, output_path)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return [output_path]
+
+
+def convert_pdf_to_image(input_path, output_path, pages=None, dpi=200, workers=1):
+    import pdf2image
+
+    page_count = pdf2image.pdfinfo_from_path(input_path)["Pages"]
+    page_numbers = _parse_pages(pages, page_count)
+    multipage = len(page_numbers) > 1 and output_path.lower().endswith((".tif", ".tiff"))
+
+    def render(numbers, paths):
+        import shutil
+        import tempfile
+
+        targets = dict(zip(numbers, paths))
+        # One pdftoppm run per contiguous run of pages, so "1,500" renders two
+        # pages rather than everything between them.
+        runs = []
+        for number in sorted(targets):
+            if runs and number == runs[-1][1] + 1:
+                runs[-1][1] = number
+            else:
+                runs.append([number, number])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for first, last in runs:
+                rendered = pdf2image.convert_from_path(
+                    input_path,
+                    dpi=dpi,
+                    first_page=first + 1,
+                    last_page=last + 1,
+                    thread_count=workers,
+                    output_folder=temp_dir,
+                    fmt="png",
+                    paths_only=True,
+                )
+                # Returned in page order. Each pdftoppm thread gets its own
+                # random file prefix, so sorting the names would shuffle the
+                # pages.
+                for number, path in zip(range(first, last + 1), rendered):
+                    if targets[number].lower().endswith(".png"):
+                        shutil.move(path, targets[number])
+                    else:
+                        from PIL import Image
+
+                        with Image.open(path) as img:
+                            img.save(targets[number])
+
+    return _rasterize_pdf(render, input_path, output_path, page_numbers, page_count, multipage)
+
+
+def convert_pdf(input_path, output_path, pages=None, dpi=None, workers=1):
+    import fitz
+
+    if not output_path.lower().endswith((".png", ".jpg", ".jpeg", ".tif", ".tiff")):
+        with fitz.open(input_path) as doc:
+            doc.save(output_path)
+        return [output_path]
+
+    with fitz.open(input_path) as doc:
+        page_count = doc.page_count
+    page_numbers = _parse_pages(pages, page_count)
+    multipage = len(page_numbers) > 1 and output_path.lower().endswith((".tif", ".tiff"))
+
+    def render(numbers, paths):
+        if workers <= 1 or len(numbers) == 1:
+            _render_pdf_pages(input_path, numbers, paths, dpi)
+            return
+        # Each worker opens its own document and renders a contiguous shard.
+        shards = list(_split_evenly(list(zip(numbers, paths)), workers))
+        with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+            futures = [
+                executor.submit(
+                    _render_pdf_pages,
+                    input_path,
+                    [number for number, _ in shard],
+                    [path for _, path in shard],
+                    dpi,
+                )
+                for shard in shards
+            ]
+            for future in futures:
+                future.result()
+
+    return _rasterize_pdf(render, input_path, output_path, page_numbers, page_count, multipage)
+
+
+# Software encoder settings, so results don't depend on GPU availability.
+TRANSCODE_PRESETS = {
+    "fast": {"preset": "veryfast", "crf": 28, "audio_bitrate": "128k"},
+    "balanced": {"preset": "medium", "crf": 23, "audio_bitrate": "192k"},
+    "quality": {"preset": "slow", "crf": 18, "audio_bitrate": "256k"},
+}
+
+# Codecs each container can hold as (video, audio); None accepts anything and
+# an empty set means the container has no such stream.
+_CONTAINER_CODECS = {
+    ".mp4": ({"h264", "hevc", "mpeg4", "av1"}, {"aac", "mp3", "alac", "ac3", "opus"}),
+    ".mov": ({"h264", "hevc", "mpeg4", "prores", "mjpeg"}, {"aac", "mp3", "alac", "pcm_s16le"}),
+    ".mkv": (None, None),
+    ".webm": ({"vp8", "vp9", "av1"}, {"vorbis", "opus"}),
+    ".avi": ({"mpeg4", "h264", "mjpeg", "msmpeg4v3"}, {"mp3", "ac3", "pcm_s16le"}),
+    ".flv": ({"h264", "flv1"}, {"aac", "mp3"}),
+    ".wmv": ({"wmv1", "wmv2", "wmv3"}, {"wmav1", "wmav2"}),
+    ".mp3": (set(), {"mp3"}),
+    ".wav": (set(), {"pcm_s16le", "pcm_s24le", "pcm_f32le", "pcm_u8"}),
+    ".ogg": (set(), {"vorbis", "opus", "flac"}),
+    ".flac": (set(), {"flac"}),
+    ".aac": (set(), {"aac"}),
+    ".m4a": (set(), {"aac", "alac"}),
+    ".wma": (set(), {"wmav1", "wmav2"}),
+}
+
+_DEFAULT_ENCODERS = {
+    ".mp4": ("libx264", "aac"),
+    ".mov": ("libx264", "aac"),
+    ".mkv": ("libx264", "aac"),
+    ".webm": ("libvpx-vp9", "libopus"),
+    ".avi": ("mpeg4", "libmp3lame"),
+    ".flv": ("libx264", "aac"),
+    ".wmv": ("wmv2", "wmav2"),
+    ".mp3": (None, "libmp3lame"),
+    ".wav": (None, "pcm_s16le"),
+    ".ogg": (None, "libvorbis"),
+    ".flac": (None, "flac"),
+    ".aac": (None, "aac"),
+    ".m4a": (None, "aac"),
+    ".wma": (None, "wmav2"),
+}
+
+_LOSSLESS_AUDIO = ("pcm_", "flac", "alac")
+
+
+def probe_media(path):
+    # Returns {"duration": seconds or None, "video": codec, "audio": codec}
+    # for the first stream of each kind, preferring ffprobe when installed.
+    info = {"duration": None, "video": None, "audio": None}
+    if check_command("ffprobe", "-version"):
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration:stream=codec_type,codec_name",
+             "-of", "json", path],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        data = json.loads(output)
+        for stream in data.get("streams", []):
+            kind = stream.get("codec_type")
+            if kind in ("video", "audio") and info[kind] is None:
+                info[kind] = stream.get("codec_name")
+        duration = data.get("format", {}).get("duration")
+        info["duration"] = float(duration) if duration else None
+        return info
+
+    stderr = subprocess.run(
+        [ffmpeg_executable() or "ffmpeg", "-hide_banner", "-i", path], capture_output=True, text=True
+    ).stderr
+    for kind, codec in re.findall(r"Stream #\d+:\d+.*?: (Video|Audio): (\w+)", stderr):
+        if info[kind.lower()] is None:
+            info[kind.lower()] = codec
+    match = re.search(r"Duration: (\d+):(\d+):([\d.]+)", stderr)
+    if match:
+        hours, minutes, seconds = match.groups()
+        info["duration"] = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    return info
+
+
+def _stream_args(kind, source_codec, output_ext, codec, copy, settings):
+    allowed = _CONTAINER_CODECS.get(output_ext, (None, None))[0 if kind == "video" else 1]
+    flag = "-c:v" if kind == "video" else "-c:a"
+    if source_codec is None:
+        return [], None
+    if allowed is not None and not allowed and codec is None:
+        return ["-vn" if kind == "video" else "-an"], None
+    if codec is None and copy and (allowed is None or source_codec in allowed):
+        return [flag, "copy"], "copy"
+
+    if codec is None:
+        codec = _DEFAULT_ENCODERS.get(output_ext, (None, None))[0 if kind == "video" else 1]
+    args = [flag, codec] if codec else []
+    if kind == "video":
+        if codec in ("libx264", "libx265"):
+            args += ["-preset", settings["preset"], "-crf", str(settings["crf"])]
+        elif codec in ("libvpx-vp9", "libvpx"):
+            args += ["-crf", str(settings["crf"] + 10), "-b:v", "0", "-row-mt", "1"]
+    elif codec and not codec.startswith(_LOSSLESS_AUDIO):
+        args += ["-b:a", settings["audio_bitrate"]]
+    return args, "encode"
+
+
+def _transcode_command(input_path, output_path, info, preset="balanced", threads=None,
+                       video_codec=None, audio_codec=None, copy=True):
+    settings = TRANSCODE_PRESETS[preset]
+    output_ext = os.path.splitext(output_path)[1].lower()
+    video_args, video_mode = _stream_args("video", info["video"], output_ext, video_codec, copy, settings)
+    audio_args, audio_mode = _stream_args("audio", info["audio"], output_ext, audio_codec, copy, settings)
+    modes = {mode for mode in (video_mode, audio_mode) if mode}
+    command = [ffmpeg_executable() or "ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-nostats",
+               "-progress", "pipe:1", "-i", input_path, *video_args, *audio_args]
+    if "encode" in modes and threads:
+        command += ["-threads", str(threads)]
+    if output_ext in (".mp4", ".mov", ".m4a"):
+        command += ["-movflags", "+faststart"]
+    command.append(output_path)
+    return command, "copy" if modes == {"copy"} else "transcode"
+
+
+def _read_progress(stdout, input_path, output_path, duration, callback):
+    # ffmpeg -progress writes key=value lines, closing each block with
+    # progress=continue or progress=end.
+    block = {}
+    for line in stdout:
+        key, _, value = line.strip().partition("=")
+        block[key] = value
+        if key != "progress":
+            continue
+        out_time = block.get("out_time_us") or block.get("out_time_ms")
+        seconds = int(out_time) / 1e6 if out_time and out_time.lstrip("-").isdigit() else None
+        event = {
+            "input": input_path,
+            "output": output_path,
+            "out_time": seconds,
+            "percent": min(100.0, seconds / duration * 100) if seconds is not None and duration else None,
+            "frame": int(block["frame"]) if block.get("frame", "").isdigit() else None,
+            "fps": float(block["fps"]) if block.get("fps", "").replace(".", "", 1).isdigit() else None,
+            "speed": block.get("speed", "").rstrip("x").strip() or None,
+            "done": value == "end",
+        }
+        if callback is not None:
+            callback(event)
+        block = {}
+
+
+# copy=True remuxes streams whose codec the target container already accepts;
+# progress, when given, is called with a dict per ffmpeg progress report.
+def transcode(input_path, output_path, preset="balanced", threads=None, video_codec=None,
+              audio_codec=None, copy=True, progress=None):
+    import tempfile
+
+    if not ffmpeg_executable():
+        raise ValueError("FFmpeg is not available. Transcoding is not supported.")
+    if preset not in TRANSCODE_PRESETS:
+        raise ValueError(f"Unknown transcode preset: {preset}")
+    info = probe_media(input_path)
+    command, mode = _transcode_command(
+        input_path, output_path, info, preset, threads, video_codec, audio_codec, copy
+    )
+    start = time.perf_counter()
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                   stderr=stderr, text=True)
+        try:
+            _read_progress(process.stdout, input_path, output_path, info["duration"], progress)
+        except BaseException:
+            # Includes the TimeoutError _time_limit raises; don't wait for
+            # ffmpeg to finish a job nobody is waiting on.
+            process.kill()
+            raise
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+        if returncode != 0:
+            stderr.seek(0)
+            message = stderr.read().decode(errors="replace").strip()
+            raise ValueError(f"ffmpeg failed with status {returncode}: {message}")
+    return {
+        "input": input_path,
+        "output": output_path,
+        "mode": mode,
+        "duration": time.perf_counter() - start,
+        "media_duration": info["duration"],
+    }
+
+
+# jobs is a list of (input_path, output_path). Encoder threads are split
+# between the concurrently running ffmpeg processes.
+def transcode_batch(jobs, workers=None, preset="balanced", progress=None, **options):
+    from concurrent.futures import ThreadPoolExecutor
+
+    cpus = os.cpu_count() or 1
+    workers = workers or max(1, cpus // 4)
+    options.setdefault("threads", max(1, cpus // workers))
+
+    def run(job):
+        try:
+            return transcode(job[0], job[1], preset=preset, progress=progress, **options)
+        except Exception as e:
+            return {"input": job[0], "output": job[1], "mode": None, "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run, jobs))
+
+
+def convert_video(input_path, output_path, **options):
+    if not ffmpeg_executable():
         raise ValueError("FFmpeg is not available. Video conversion is not supported.")
+    transcode(input_path, output_path, **options)
+
+
+def convert_audio(input_path, output_path, **options):
+    if not ffmpeg_executable():
+        raise ValueError("FFmpeg is not available. Audio conversion is not supported.")
+    transcode(input_path, output_path, **options)
 
 
 def convert_docx_to_pdf(input_path, output_path):
+    import docx2pdf
+
     docx2pdf.convert(input_path, output_path)
 
 
-def convert_audio(input_path, output_path):
-    if ffmpeg_available:
-        audio = AudioSegment.from_file(input_path)
-        audio.export(output_path, format=os.path.splitext(output_path)[1][1:])
+def _peak_rss():
+    # Peak resident set size of this process in bytes.
+    try:
+        import resource
+    except ImportError:
+        import psutil
+
+        return psutil.Process().memory_info().peak_wset
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@contextmanager
+def _open_text(input_path):
+    # Accepts a path or a binary file object, such as an archive member.
+    if hasattr(input_path, "read"):
+        import io
+
+        file = io.TextIOWrapper(input_path, encoding="utf-8")
+        try:
+            yield file
+        finally:
+            file.detach()
     else:
-        raise ValueError("FFmpeg is not available. Audio conversion is not supported.")
+        with open(input_path, "r") as file:
+            yield file
+
+
+def _read_data_chunks(input_path, input_ext, chunksize):
+    import pandas as pd
+
+    if input_ext == ".csv":
+        yield from pd.read_csv(input_path, chunksize=chunksize)
+    elif input_ext in (".json", ".ndjson", ".jsonl"):
+        with _open_text(input_path) as file:
+            for batch in _batched(_iter_json_records(file), chunksize):
+                yield pd.DataFrame(batch)
+    elif input_ext == ".xlsx":
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(input_path, read_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            width = len(header or ())
+            for batch in _batched(rows, chunksize):
+                # Read-only sheets drop trailing empty cells, so pad short rows.
+                batch = [row + (None,) * (width - len(row)) for row in batch]
+                yield pd.DataFrame(batch, columns=header)
+        finally:
+            workbook.close()
+    elif input_ext == ".yaml":
+        # A YAML document has to be parsed whole; chunking bounds the output
+        # side and lets multi-document files (as written below) stream.
+        with _open_text(input_path) as file:
+            for data in yaml.safe_load_all(file):
+                df = pd.DataFrame(data)
+                for start in range(0, len(df), chunksize):
+                    yield df.iloc[start:start + chunksize]
+    elif input_ext in COLUMNAR_EXTENSIONS:
+        _, batches = _read_arrow_batches(input_path, input_ext, chunksize)
+        for batch in batches:
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Chunked conversion does not support {input_ext} input")
+
+
+# Parquet row groups default to pyarrow's own maximum rather than the read
+# batch size; small groups compress worse and slow down readers.
+_PARQUET_ROW_GROUP = 1 << 20
+
+
+def _row_group_rows(output_ext, row_group_size):
+    if row_group_size:
+        return row_group_size
+    return _PARQUET_ROW_GROUP if output_ext == ".parquet" else None
+
+
+def _grouped_tables(tables, size):
+    # Regroups a stream of tables into tables of size rows (the last may be
+    # shorter), so each is written as one row group. size None passes them
+    # through.
+    import pyarrow as pa
+
+    if not size:
+        yield from tables
+        return
+    pending = []
+    pending_rows = 0
+    for table in tables:
+        pending.append(table)
+        pending_rows += table.num_rows
+        while pending_rows >= size:
+            combined = pa.concat_tables(pending)
+            yield combined.slice(0, size)
+            rest = combined.slice(size)
+            pending = [rest] if rest.num_rows else []
+            pending_rows = rest.num_rows
+    if pending_rows:
+        yield pa.concat_tables(pending)
+
+
+def _write_data_chunks(chunks, output_path, output_ext, compression=None, row_group_size=None):
+    rows = 0
+    count = 0
+    if output_ext in COLUMNAR_EXTENSIONS:
+        import pyarrow as pa
+
+        def tables():
+            nonlocal rows, count
+            schema = None
+            for count, df in enumerate(chunks, 1):
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if schema is None:
+                    # The schema is fixed by the first chunk. A column that
+                    # is all null there is typed as text so later values fit.
+                    schema = pa.schema(
+                        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                        for field in table.schema
+                    )
+                if not table.schema.equals(schema):
+                    table = table.cast(schema)
+                rows += len(df)
+                yield table
+
+        group_size = _row_group_rows(output_ext, row_group_size)
+        writer = None
+        try:
+            for table in _grouped_tables(tables(), group_size):
+                if writer is None:
+                    writer = _open_arrow_writer(output_path, output_ext, table.schema, compression)
+                writer.write_table(table, group_size)
+        finally:
+            if writer is not None:
+                writer.close()
+    elif output_ext == ".csv":
+        for count, df in enumerate(chunks, 1):
+            df.to_csv(output_path, index=False, mode="w" if count == 1 else "a", header=count == 1)
+            rows += len(df)
+    elif output_ext in (".json", ".ndjson", ".jsonl"):
+        ndjson = output_ext != ".json"
+        with open(output_path, "w") as file:
+            if not ndjson:
+                file.write("[")
+            for count, df in enumerate(chunks, 1):
+                if ndjson:
+                    file.write(df.to_json(orient="records", lines=True))
+                elif len(df):
+                    file.write("," if rows else "")
+                    file.write(df.to_json(orient="records")[1:-1])
+                rows += len(df)
+            if not ndjson:
+                file.write("]")
+    elif output_ext == ".yaml":
+        with open(output_path, "w") as file:
+            for count, df in enumerate(chunks, 1):
+                yaml.dump(df.to_dict(orient="records"), file, explicit_start=True)
+                rows += len(df)
+    elif output_ext == ".xlsx":
+        import openpyxl
+
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        for count, df in enumerate(chunks, 1):
+            if count == 1:
+                sheet.append([str(column) for column in df.columns])
+            df = df.astype(object).where(df.notna(), None)
+            for row in df.itertuples(index=False, name=None):
+                sheet.append(row)
+            rows += len(df)
+        workbook.save(output_path)
+    else:
+        raise ValueError(f"Chunked conversion does not support {output_ext} output")
+    return rows, count
+
+
+def _rebatch(batches, size):
+    for batch in batches:
+        for start in range(0, batch.num_rows, size):
+            yield batch.slice(start, size)
+
+
+def _read_arrow_batches(input_path, input_ext, batch_size, column_types=None):
+    # Returns the schema and an iterator of record batches of at most
+    # batch_size rows, read without going through pandas. NDJSON is parsed
+    # whole by pyarrow but still handed out in batches. column_types
+    # overrides the types pyarrow infers for CSV columns.
+    import pyarrow as pa
+
+    if input_ext == ".parquet":
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(input_path)
+        return parquet.schema_arrow, parquet.iter_batches(batch_size=batch_size)
+    if input_ext in (".feather", ".arrow"):
+        # Memory-mapped, so batches are read lazily.
+        source = pa.memory_map(input_path) if isinstance(input_path, (str, os.PathLike)) else input_path
+        reader = pa.ipc.open_file(source)
+        return reader.schema, _rebatch((reader.get_batch(i) for i in range(reader.num_record_batches)), batch_size)
+    if input_ext == ".csv":
+        import pyarrow.csv
+
+        # Blocks are sized in bytes, so rows are re-sliced to batch_size. A
+        # stream is rewound, as _convert_arrow may read it more than once.
+        if hasattr(input_path, "seek"):
+            input_path.seek(0)
+        reader = pyarrow.csv.open_csv(
+            input_path,
+            read_options=pyarrow.csv.ReadOptions(block_size=1 << 22),
+            convert_options=pyarrow.csv.ConvertOptions(column_types=column_types or {}),
+        )
+        return reader.schema, _rebatch(reader, batch_size)
+    if input_ext in (".ndjson", ".jsonl"):
+        import pyarrow.json
+
+        table = pyarrow.json.read_json(input_path)
+        return table.schema, iter(table.to_batches(batch_size))
+    raise ValueError(f"Arrow conversion does not support {input_ext} input")
+
 
+def _open_arrow_writer(output_path, output_ext, schema, compression=None):
+    # Both writers take write_table(table, rows_per_group_or_batch) and close().
+    import pyarrow as pa
+
+    if output_ext == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(output_path, schema, compression=compression or "snappy")
+    if compression in ("none", "uncompressed"):
+        compression = None
+    elif compression is None:
+        # Same default as pyarrow.feather.write_feather.
+        compression = "lz4"
+    return pa.ipc.new_file(output_path, schema, options=pa.ipc.IpcWriteOptions(compression=compression))
+
+
+def _convert_arrow(input_path, output_path, input_ext, output_ext, batch_size=65536, compression=None,
+                   row_group_size=None):
+    # pyarrow fixes CSV column types from the first block, so a column that
+    # turns out not to be numeric further down fails mid-file. Start over
+    # with that column read as text, as pandas would.
+    import pyarrow as pa
+
+    column_types = {}
+    while True:
+        try:
+            return _write_arrow(input_path, output_path, input_ext, output_ext, batch_size, compression,
+                                row_group_size, column_types)
+        except pa.ArrowInvalid as e:
+            match = re.search(r"In CSV column #(\d+)", str(e))
+            if input_ext != ".csv" or match is None:
+                raise
+            name = _read_arrow_batches(input_path, input_ext, batch_size)[0].names[int(match.group(1))]
+            if name in column_types:
+                raise
+            logging.warning(f"CSV column {name!r} changes type partway through; reading it as text")
+            column_types[name] = pa.string()
+
+
+def _write_arrow(input_path, output_path, input_ext, output_ext, batch_size, compression, row_group_size,
+                 column_types):
+    # Moves record batches straight from the reader to the writer, so values
+    # keep their Arrow types instead of round-tripping through object columns.
+    schema, batches = _read_arrow_batches(input_path, input_ext, batch_size, column_types)
+    rows = 0
+    count = 0
+    if output_ext in COLUMNAR_EXTENSIONS:
+        import pyarrow as pa
+
+        def tables():
+            nonlocal rows, count
+            for count, batch in enumerate(batches, 1):
+                rows += batch.num_rows
+                yield pa.Table.from_batches([batch], schema)
+
+        group_size = _row_group_rows(output_ext, row_group_size)
+        with _open_arrow_writer(output_path, output_ext, schema, compression) as writer:
+            for table in _grouped_tables(tables(), group_size):
+                writer.write_table(table, group_size)
+    elif output_ext == ".csv":
+        import pyarrow.csv
+
+        with pyarrow.csv.CSVWriter(output_path, schema) as writer:
+            for count, batch in enumerate(batches, 1):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    elif output_ext in (".ndjson", ".jsonl"):
+        with open(output_path, "w") as file:
+            for count, batch in enumerate(batches, 1):
+                _write_json_records(batch.to_pylist(), file, ndjson=True, default=str)
+                rows += batch.num_rows
+    else:
+        raise ValueError(f"Arrow conversion does not support {output_ext} output")
+    return rows, count
+
+
+def _local_name(tag):
+    return tag.rpartition("}")[2] if "}" in tag else tag
+
+
+def _xml_to_dict(elem):
+    # Attributes become "@name" keys and repeated child tags become lists. A
+    # leaf without attributes is just its text; otherwise text is kept under
+    # "#text" when it is not whitespace.
+    if not len(elem) and not elem.attrib:
+        return elem.text
+    data = {f"@{_local_name(name)}": value for name, value in elem.attrib.items()}
+    for child in elem:
+        tag = _local_name(child.tag)
+        value = _xml_to_dict(child)
+        if tag not in data:
+            data[tag] = value
+        elif isinstance(data[tag], list):
+            data[tag].append(value)
+        else:
+            data[tag] = [data[tag], value]
+    text = elem.text
+    if text and not text.isspace():
+        data["#text"] = text.strip()
+    return data
+
+
+def _iter_xml_records(input_path, record_tag=None):
+    # Yields one dict per record element: every element named record_tag
+    # (outermost only), or each child of the root when it is None. Finished
+    # records are cleared and detached from their parent, so memory stays
+    # flat however long the document is.
+    matches = {}
+    stack = []
+    record_depth = None
+    for event, elem in ET.iterparse(input_path, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            if record_depth is None:
+                if record_tag is None:
+                    if len(stack) == 2:
+                        record_depth = 2
+                else:
+                    match = matches.get(elem.tag)
+                    if match is None:
+                        match = matches[elem.tag] = _local_name(elem.tag) == record_tag
+                    if match:
+                        record_depth = len(stack)
+            continue
+        if len(stack) != record_depth:
+            stack.pop()
+            if record_depth is None:
+                # Content outside any record is done with once it closes.
+                elem.clear()
+                if stack:
+                    stack[-1].remove(elem)
+            continue
+        record_depth = None
+        if len(elem) or elem.attrib:
+            yield _xml_to_dict(elem)
+        else:
+            yield {_local_name(elem.tag): elem.text}
+        elem.clear()
+        stack.pop()
+        if stack:
+            stack[-1].remove(elem)
+
+
+def _flatten_record(record, prefix=""):
+    # Nested dicts become dotted columns, lists are kept as JSON text.
+    if not isinstance(record, dict):
+        return {prefix or "value": record}
+    flat = {}
+    for key, value in record.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten_record(value, name))
+        elif isinstance(value, list):
+            flat[name] = json.dumps(value)
+        else:
+            flat[name] = value
+    return flat
+
+
+def convert_xml(input_path, output_path, record_tag=None, fieldnames=None, sample=1000, chunksize=None):
+    # Streams XML records out as a JSON array, NDJSON or CSV rows (YAML and
+    # XLSX go through DataFrames of chunksize records). CSV columns are
+    # fieldnames when given, else the union of the keys in the first sample
+    # records; keys that only show up later are dropped with a warning.
+    import itertools
 
-def convert_data_format(input_path, output_path):
-    input_ext = os.path.splitext(input_path)[1].lower()
     output_ext = os.path.splitext(output_path)[1].lower()
+    records = _iter_xml_records(input_path, record_tag)
+    count = 0
+
+    def counted(items):
+        nonlocal count
+        for count, item in enumerate(items, 1):
+            yield item
 
-    if input_ext in (".json", ".yaml", ".csv", ".xlsx"):
+    if output_ext in (".json", ".ndjson", ".jsonl"):
+        with open(output_path, "w") as file:
+            _write_json_records(counted(records), file, ndjson=output_ext != ".json", indent=2)
+    elif output_ext == ".csv":
+        rows = (_flatten_record(record) for record in records)
+        head = list(itertools.islice(rows, sample))
+        if fieldnames is None:
+            fieldnames = list(dict.fromkeys(key for row in head for key in row))
+        known = set(fieldnames)
+        warned = False
+        with open(output_path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames, extrasaction="ignore")
+            writer.writeheader()
+            for row in counted(itertools.chain(head, rows)):
+                if not warned and not known.issuperset(row):
+                    logging.warning(f"Dropping XML fields missing from the CSV header: {sorted(set(row) - known)}")
+                    warned = True
+                writer.writerow(row)
+    elif output_ext in (".yaml", ".xlsx"):
+        import pandas as pd
+
+        chunks = (
+            pd.DataFrame([_flatten_record(record) for record in batch])
+            for batch in _batched(counted(records), chunksize or 10000)
+        )
+        _write_data_chunks(chunks, output_path, output_ext)
+    else:
+        raise ValueError(f"Unsupported data format conversion: .xml to {output_ext}")
+    return {"records": count}
+
+
+def convert_data_format(input_path, output_path, chunksize=None, compression=None, row_group_size=None,
+                        record_tag=None, fieldnames=None):
+    # compression and row_group_size only apply to Parquet and Feather/Arrow
+    # output (row_group_size sets the record batch size for the latter);
+    # record_tag and fieldnames to XML input (see convert_xml).
+    # Arrow-native conversions always stream, in batches of chunksize rows
+    # (65536 by default).
+    input_ext = os.path.splitext(getattr(input_path, "name", input_path))[1].lower()
+    output_ext = os.path.splitext(output_path)[1].lower()
+
+    if input_ext == ".xml":
+        return convert_xml(input_path, output_path, record_tag, fieldnames, chunksize=chunksize)
+
+    if (
+        input_ext in ARROW_EXTENSIONS
+        and output_ext in ARROW_EXTENSIONS
+        and (input_ext in COLUMNAR_EXTENSIONS or output_ext in COLUMNAR_EXTENSIONS)
+    ):
+        rows, count = _convert_arrow(
+            input_path, output_path, input_ext, output_ext, chunksize or 65536, compression, row_group_size
+        )
+        stats = {"rows": rows, "chunks": count, "peak_rss": _peak_rss()}
+        logging.info(f"Arrow conversion wrote {rows} rows in {count} batches")
+        return stats
+
+    import pandas as pd
+
+    if chunksize:
+        chunks = _read_data_chunks(input_path, input_ext, chunksize)
+        rows, count = _write_data_chunks(chunks, output_path, output_ext, compression, row_group_size)
+        stats = {"rows": rows, "chunks": count, "peak_rss": _peak_rss()}
+        logging.info(
+            f"Chunked conversion wrote {rows} rows in {count} chunks, peak RSS {stats['peak_rss'] / 2**20:.1f} MiB"
+        )
+        return stats
+
+    if input_ext in DATA_EXTENSIONS + COLUMNAR_EXTENSIONS:
         if input_ext == ".json":
             df = pd.read_json(input_path)
+        elif input_ext in (".ndjson", ".jsonl"):
+            df = pd.read_json(input_path, lines=True)
         elif input_ext == ".yaml":
-            with open(input_path, "r") as file:
+            with _open_text(input_path) as file:
                 data = yaml.safe_load(file)
             df = pd.DataFrame(data)
         elif input_ext == ".csv":
             df = pd.read_csv(input_path)
         elif input_ext == ".xlsx":
             df = pd.read_excel(input_path)
+        elif input_ext == ".parquet":
+            df = pd.read_parquet(input_path)
+        elif input_ext in (".feather", ".arrow"):
+            df = pd.read_feather(input_path)
 
         if output_ext == ".json":
             df.to_json(output_path, orient="records", indent=2)
+        elif output_ext in (".ndjson", ".jsonl"):
+            df.to_json(output_path, orient="records", lines=True)
         elif output_ext == ".yaml":
             with open(output_path, "w") as file:
                 yaml.dump(df.to_dict(orient="records"), file)
@@ -191,14 +1237,10 @@ def convert_data_format(input_path, output_path):
             df.to_csv(output_path, index=False)
         elif output_ext == ".xlsx":
             df.to_excel(output_path, index=False)
-    elif input_ext == ".xml" and output_ext == ".json":
-        tree = ET.parse(input_path)
-        root = tree.getroot()
-        data = {root.tag: {}}
-        for child in root:
-            data[root.tag][child.tag] = child.text
-        with open(output_path, "w") as file:
-            json.dump(data, file, indent=2)
+        elif output_ext == ".parquet":
+            df.to_parquet(output_path, index=False, compression=compression or "snappy", row_group_size=row_group_size)
+        elif output_ext in (".feather", ".arrow"):
+            df.to_feather(output_path, compression=compression, chunksize=row_group_size)
     else:
         raise ValueError(
             f"Unsupported data format conversion: {input_ext} to {output_ext}"
@@ -215,10 +1257,11 @@ def convert_svg(input_path, output_path):
         raise ValueError("SVG conversion is not supported without CairoSVG")
 
 
-def check_command(command):
+@lru_cache(maxsize=None)
+def check_command(command, version_flag="--version"):
     try:
         subprocess.run(
-            [command, "--version"],
+            [command, version_flag],
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
             check=True,
@@ -228,11 +1271,10 @@ def check_command(command):
         return False
 
 
-pandoc_available = check_command("pandoc")
-calibre_available = check_command("ebook-convert")
-
 
 def markdown_to_html(md_file, html_file):
+    import markdown
+
     with open(md_file, "r", encoding="utf-8") as f:
         md_content = f.read()
     html_content = markdown.markdown(md_content)
@@ -240,9 +1282,31 @@ def markdown_to_html(md_file, html_file):
         f.write(html_content)
 
 
+def _markdown_to_pdf_command(md_file, pdf_file):
+    return ["pandoc", md_file, "-o", pdf_file]
+
+
+def _html_to_markdown_command(html_file, md_file):
+    return ["pandoc", "-f", "html", "-t", "markdown", "-o", md_file, html_file]
+
+
+def _epub_to_pdf_command(epub_file, pdf_file):
+    return ["ebook-convert", epub_file, pdf_file]
+
+
+def _ffmpeg_command(input_path, output_path, preset="balanced", threads=None, video_codec=None, audio_codec=None,
+                    copy=True):
+    # The argv transcode() would run, so async conversions remux and pick
+    # encoders exactly like the synchronous path.
+    return _transcode_command(
+        input_path, output_path, probe_media(input_path), preset=preset, threads=threads,
+        video_codec=video_codec, audio_codec=audio_codec, copy=copy,
+    )[0]
+
+
 def markdown_to_pdf(md_file, pdf_file):
-    if pandoc_available:
-        subprocess.run(["pandoc", md_file, "-o", pdf_file])
+    if check_command("pandoc"):
+        subprocess.run(_markdown_to_pdf_command(md_file, pdf_file))
     else:
         raise ValueError(
             "Pandoc is not available. Markdown to PDF conversion is not supported."
@@ -250,10 +1314,13 @@ def markdown_to_pdf(md_file, pdf_file):
 
 
 def html_to_markdown(html_file, md_file):
-    if pandoc_available:
-        subprocess.run(
-            ["pandoc", "-f", "html", "-t", "markdown", "-o", md_file, html_file]
-        )
+    if _pandoc_server is not None:
+        with open(html_file, "r", encoding="utf-8") as f:
+            request = {"text": f.read(), "from": "html", "to": "markdown"}
+        with open(md_file, "wb") as f:
+            f.write(_pandoc_server_batch(_pandoc_server["url"], [request])[0])
+    elif check_command("pandoc"):
+        subprocess.run(_html_to_markdown_command(html_file, md_file))
     else:
         raise ValueError(
             "Pandoc is not available. HTML to Markdown conversion is not supported."
@@ -261,49 +1328,646 @@ def html_to_markdown(html_file, md_file):
 
 
 def epub_to_pdf(epub_file, pdf_file):
-    if calibre_available:
-        subprocess.run(["ebook-convert", epub_file, pdf_file])
+    if check_command("ebook-convert"):
+        subprocess.run(_epub_to_pdf_command(epub_file, pdf_file))
     else:
         raise ValueError(
             "Calibre is not available. EPUB to PDF conversion is not supported."
         )
 
 
-def compress_zip(input_file, output_file):
-    with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as zipf:
-        zipf.write(input_file, os.path.basename(input_file))
+# Long-lived headless LibreOffice instances, each with its own profile. A
+# "soffice --convert-to" call that names a running instance's profile hands the
+# job to that instance over LibreOffice's IPC pipe and exits, so conversions
+# skip office startup entirely. _office_workers is the queue of idle instances;
+# _office_instances holds every instance, checked out or not, for shutdown.
+_office_workers = None
+_office_instances = {}
+_office_lock = threading.Lock()
+_office_cleanup_pid = None
+
+
+def _forget_office_pool():
+    # A forked child (a batch_convert or daemon worker) starts its own pool
+    # rather than sharing, and later stopping, its parent's instances.
+    global _office_workers, _office_lock
+    _office_workers = None
+    _office_instances.clear()
+    _office_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_office_pool)
+
+
+def _start_office_worker(index, soffice):
+    import tempfile
+
+    profile = tempfile.mkdtemp(prefix=f"fileconvert-office-{index}-")
+    profile_url = "file://" + profile.replace(os.sep, "/")
+    process = subprocess.Popen(
+        [
+            soffice,
+            f"-env:UserInstallation={profile_url}",
+            "--headless",
+            "--invisible",
+            "--nologo",
+            "--norestore",
+            "--nolockcheck",
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return {"index": index, "soffice": soffice, "profile": profile, "profile_url": profile_url, "process": process}
+
+
+def start_office_pool(size=2, soffice="soffice"):
+    import queue
+
+    global _office_workers, _office_cleanup_pid
+    with _office_lock:
+        if _office_workers is not None:
+            return
+        _office_workers = queue.Queue()
+        for index in range(size):
+            worker = _start_office_worker(index, soffice)
+            _office_instances[index] = worker
+            _office_workers.put(worker)
+        if _office_cleanup_pid != os.getpid():
+            # multiprocessing runs its finalizers at interpreter exit and when
+            # a pool worker process exits, where atexit hooks are skipped.
+            from multiprocessing.util import Finalize
+
+            Finalize(None, stop_office_pool, exitpriority=10)
+            _office_cleanup_pid = os.getpid()
+
+
+def _stop_office_worker(worker):
+    import shutil
+
+    worker["process"].terminate()
+    try:
+        worker["process"].wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        worker["process"].kill()
+    shutil.rmtree(worker["profile"], ignore_errors=True)
+
+
+def stop_office_pool():
+    global _office_workers
+    with _office_lock:
+        _office_workers = None
+        instances = list(_office_instances.values())
+        _office_instances.clear()
+    # Checked-out instances are stopped too; their conversions fail.
+    for worker in instances:
+        _stop_office_worker(worker)
+
+
+def office_to_pdf(input_path, output_path):
+    import shutil
+    import tempfile
+
+    if not check_command("soffice"):
+        raise ValueError("LibreOffice is not available. Office to PDF conversion is not supported.")
+    if _office_workers is None:
+        start_office_pool()
+    workers = _office_workers
+    worker = workers.get()
+    try:
+        if worker["process"].poll() is not None:
+            shutil.rmtree(worker["profile"], ignore_errors=True)
+            worker = _start_office_worker(worker["index"], worker["soffice"])
+            with _office_lock:
+                if _office_workers is workers:
+                    _office_instances[worker["index"]] = worker
+        with tempfile.TemporaryDirectory() as out_dir:
+            result = subprocess.run(
+                [
+                    worker["soffice"],
+                    f"-env:UserInstallation={worker['profile_url']}",
+                    "--headless",
+                    "--convert-to",
+                    "pdf",
+                    "--outdir",
+                    out_dir,
+                    os.path.abspath(input_path),
+                ],
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                text=True,
+            )
+            converted = os.path.join(out_dir, os.path.splitext(os.path.basename(input_path))[0] + ".pdf")
+            if not os.path.exists(converted):
+                raise ValueError(f"LibreOffice failed to convert {input_path}: {result.stderr.strip()}")
+            shutil.move(converted, output_path)
+    finally:
+        with _office_lock:
+            current = _office_workers is workers
+        if current:
+            workers.put(worker)
+        else:
+            # The pool was stopped while this instance was checked out.
+            _stop_office_worker(worker)
+
+
+# A running "pandoc server" converts many documents per HTTP request, so batches
+# of text conversions share one pandoc process.
+_pandoc_server = None
+
+
+def start_pandoc_server(timeout=10):
+    import shutil
+    import socket
+    import urllib.request
+
+    global _pandoc_server
+    if _pandoc_server is not None:
+        return _pandoc_server["url"]
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    command = ["pandoc-server"] if shutil.which("pandoc-server") else ["pandoc", "server"]
+    process = subprocess.Popen(
+        command + ["--port", str(port)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            urllib.request.urlopen(url + "/version", timeout=1).close()
+            break
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise ValueError("pandoc server could not be started")
+            time.sleep(0.05)
+    _pandoc_server = {"process": process, "url": url}
+    return url
+
+
+def stop_pandoc_server():
+    global _pandoc_server
+    server, _pandoc_server = _pandoc_server, None
+    if server is not None:
+        server["process"].terminate()
+        server["process"].wait()
+
+
+def _pandoc_server_batch(url, requests):
+    import base64
+    import urllib.request
+
+    request = urllib.request.Request(
+        url + "/batch",
+        data=json.dumps(requests).encode(),
+        headers={"Content-Type": "application/json", "Accept": "application/json"},
+    )
+    with urllib.request.urlopen(request) as response:
+        results = json.load(response)
+    outputs = []
+    for result in results:
+        if isinstance(result, dict):
+            output = result["output"]
+            outputs.append(base64.b64decode(output) if result.get("base64") else output.encode("utf-8"))
+        else:
+            outputs.append(result.encode("utf-8"))
+    return outputs
 
 
-def extract_zip(input_file, output_dir):
-    with zipfile.ZipFile(input_file, "r") as zipf:
-        zipf.extractall(output_dir)
+# jobs is a list of (input_path, output_path). PDF output needs a PDF engine
+# that pandoc server does not run, so it falls back to one pandoc per file, as
+# do builds of pandoc without server support.
+def pandoc_batch(jobs, from_format, to_format, batch_size=100):
+    if not check_command("pandoc"):
+        raise ValueError("Pandoc is not available. Batch conversion is not supported.")
 
+    started = False
+    url = _pandoc_server["url"] if _pandoc_server is not None else None
+    if url is None and to_format != "pdf":
+        try:
+            url = start_pandoc_server()
+            started = True
+        except ValueError as e:
+            logging.warning(f"{e}; converting one file per pandoc process")
 
-def compress_rar(input_file, output_file):
-    with rarfile.RarFile(output_file, "w") as rarf:
-        rarf.add(input_file, os.path.basename(input_file))
+    if url is None:
+        target = [] if to_format == "pdf" else ["-t", to_format]
+        for input_path, output_path in jobs:
+            subprocess.run(["pandoc", "-f", from_format, *target, input_path, "-o", output_path], check=True)
+        return
+
+    try:
+        for batch in _batched(jobs, batch_size):
+            requests = []
+            for input_path, _ in batch:
+                with open(input_path, "r", encoding="utf-8") as f:
+                    requests.append({"text": f.read(), "from": from_format, "to": to_format})
+            for (_, output_path), output in zip(batch, _pandoc_server_batch(url, requests)):
+                with open(output_path, "wb") as f:
+                    f.write(output)
+    finally:
+        if started:
+            stop_pandoc_server()
+
+
+# Already-compressed formats gain nothing from deflate; store them as they are.
+STORED_EXTENSIONS = {
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".heic",
+    ".mp4", ".mov", ".mkv", ".webm", ".avi", ".flv", ".wmv",
+    ".mp3", ".aac", ".m4a", ".ogg", ".flac", ".wma",
+    ".zip", ".gz", ".bz2", ".xz", ".zst", ".7z", ".rar",
+    ".docx", ".xlsx", ".pptx", ".epub",
+}
+
+def _iter_archive_inputs(input_file):
+    # Yields (path, arcname) for a file, a directory tree, a glob pattern or a
+    # list of any of those, without building the full listing up front.
+    import glob
+
+    if isinstance(input_file, (list, tuple)):
+        for item in input_file:
+            yield from _iter_archive_inputs(item)
+        return
+    if os.path.isdir(input_file):
+        base = os.path.dirname(os.path.abspath(input_file))
+        for root, dirs, files in os.walk(input_file):
+            dirs.sort()
+            if not dirs and not files:
+                yield root, os.path.relpath(os.path.abspath(root), base)
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                yield path, os.path.relpath(os.path.abspath(path), base)
+    elif glob.has_magic(input_file):
+        parts = []
+        for part in input_file.replace(os.sep, "/").split("/"):
+            if glob.has_magic(part):
+                break
+            parts.append(part)
+        base = "/".join(parts) or "."
+        for path in sorted(glob.iglob(input_file, recursive=True)):
+            if os.path.isfile(path):
+                yield path, os.path.relpath(path, base)
+    elif os.path.exists(input_file):
+        yield input_file, os.path.basename(input_file)
+    else:
+        raise FileNotFoundError(f"No such file or directory: {input_file}")
+
+
+def _archive_stats(files, bytes_in, output_file, start):
+    duration = time.perf_counter() - start
+    return {
+        "files": files,
+        "bytes_in": bytes_in,
+        "bytes_out": os.path.getsize(output_file),
+        "duration": duration,
+        "bytes_per_second": bytes_in / duration if duration else 0.0,
+    }
+
+
+def compress_zip(input_file, output_file, compresslevel=6):
+    # zipfile deflates on the calling thread and has no public way to add
+    # members compressed elsewhere, so this runs sequentially; already
+    # compressed types are stored.
+    start = time.perf_counter()
+    files = 0
+    bytes_in = 0
+    with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zipf:
+        for path, arcname in _iter_archive_inputs(input_file):
+            if os.path.isdir(path):
+                zipf.write(path, arcname)
+                continue
+            files += 1
+            bytes_in += os.path.getsize(path)
+            stored = os.path.splitext(path)[1].lower() in STORED_EXTENSIONS
+            zipf.write(path, arcname, compress_type=zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED)
+    return _archive_stats(files, bytes_in, output_file, start)
+
+
+def _match_members(names, members):
+    # members is None (everything), a name or glob pattern, or a list of them.
+    import fnmatch
+
+    if members is None:
+        return list(names)
+    patterns = [members] if isinstance(members, str) else list(members)
+    return [
+        name for name in names
+        if any(name == pattern or fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+    ]
+
+
+def _archive_kind(input_file):
+    ext = os.path.splitext(input_file)[1].lower()
+    if ext not in (".zip", ".rar", ".7z"):
+        raise ValueError(f"Unsupported archive format: {ext}")
+    return ext
+
+
+if sys.version_info >= (3, 13):
+    from mmap import mmap as _MappedFile
+else:
+    import mmap as _mmap
+
+    class _MappedFile(_mmap.mmap):
+        # zipfile asks its file object whether it is seekable; mmap only
+        # grew that method in 3.13.
+        def seekable(self):
+            return True
+
+
+@contextmanager
+def _open_zip(input_file):
+    # Reading through a read-only mapping lets the central directory of a huge
+    # archive be parsed straight from the page cache, and lets worker threads
+    # read members without each holding their own file handle.
+    import mmap
+
+    with open(input_file, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            raise zipfile.BadZipFile(f"File is not a zip file: {input_file}")
+        mapped = _MappedFile(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            with zipfile.ZipFile(mapped, "r") as zipf:
+                yield zipf
+        finally:
+            mapped.close()
+
+
+def list_archive(input_file):
+    kind = _archive_kind(input_file)
+    if kind == ".zip":
+        with _open_zip(input_file) as zipf:
+            return [
+                {"name": info.filename, "size": info.file_size,
+                 "compressed_size": info.compress_size, "is_dir": info.is_dir()}
+                for info in zipf.infolist()
+            ]
+    if kind == ".rar":
+        import rarfile
+
+        with rarfile.RarFile(input_file, "r") as rarf:
+            return [
+                {"name": info.filename, "size": info.file_size,
+                 "compressed_size": info.compress_size, "is_dir": info.is_dir()}
+                for info in rarf.infolist()
+            ]
+    import py7zr
+
+    with py7zr.SevenZipFile(input_file, "r") as szf:
+        return [
+            {"name": info.filename, "size": info.uncompressed,
+             "compressed_size": info.compressed, "is_dir": info.is_directory}
+            for info in szf.list()
+        ]
+
+
+def _iter_archive_members(input_file, names):
+    # Yields (name, stream) for each member, keeping one archive handle open.
+    # ZIP and non-solid RAR members are decompressed as they are read; 7z
+    # members are decompressed into memory one at a time, since py7zr has no
+    # streaming reader.
+    kind = _archive_kind(input_file)
+    if kind == ".zip":
+        with _open_zip(input_file) as zipf:
+            for name in names:
+                with zipf.open(name) as stream:
+                    yield name, stream
+    elif kind == ".rar":
+        import rarfile
+
+        with rarfile.RarFile(input_file, "r") as rarf:
+            for name in names:
+                with rarf.open(name) as stream:
+                    stream.name = name
+                    yield name, stream
+    else:
+        import io
+        import py7zr
+        from py7zr.io import BytesIOFactory
+
+        with py7zr.SevenZipFile(input_file, "r") as szf:
+            available = set(szf.getnames())
+            for name in names:
+                if name not in available:
+                    raise KeyError(f"There is no item named {name!r} in the archive")
+                factory = BytesIOFactory(limit=1 << 62)
+                szf.reset()
+                szf.extract(targets=[name], factory=factory)
+                product = factory.get(name)
+                product.seek(0)
+                # py7zr's buffer is not a full file object; hand out a real one.
+                stream = io.BytesIO(product.read())
+                del factory, product
+                stream.name = name
+                yield name, stream
+
+
+@contextmanager
+def open_archive_member(input_file, member):
+    # Yields a readable binary file object for one member without writing it
+    # to disk.
+    members = _iter_archive_members(input_file, [member])
+    try:
+        yield next(members)[1]
+    finally:
+        members.close()
+
+
+def extract_zip(input_file, output_dir, members=None, workers=1):
+    from concurrent.futures import ThreadPoolExecutor
+
+    with _open_zip(input_file) as zipf:
+        names = _match_members(zipf.namelist(), members)
+        if workers > 1 and len(names) > 1:
+            # ZipFile.extract creates parent directories without exist_ok, so
+            # make them here before the threads race for them.
+            root = os.path.abspath(output_dir)
+            for name in names:
+                parent = os.path.abspath(os.path.join(root, os.path.dirname(name)))
+                if parent == root or parent.startswith(root + os.sep):
+                    os.makedirs(parent, exist_ok=True)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(lambda name: zipf.extract(name, output_dir), names))
+        else:
+            zipf.extractall(output_dir, names)
+    return names
+
+
+def compress_rar(input_file, output_file, workers=None, level=3):
+    # rarfile can only read archives, so writing needs the rar tool. -ms stores
+    # already-compressed types, -mt sets its compression threads. rar runs from
+    # each input's base directory with relative names, so it stores the same
+    # paths as compress_zip.
+    import tempfile
+
+    if not _has_command("rar"):
+        raise ValueError("rar is not available. RAR compression is not supported.")
+    start = time.perf_counter()
+    files = 0
+    bytes_in = 0
+    groups = {}
+    for path, arcname in _iter_archive_inputs(input_file):
+        path = os.path.abspath(path)
+        groups.setdefault(path[:len(path) - len(arcname)], []).append(arcname)
+        if os.path.isfile(path):
+            files += 1
+            bytes_in += os.path.getsize(path)
+    output_file = os.path.abspath(output_file)
+    stored = ";".join(ext.lstrip(".") for ext in sorted(STORED_EXTENSIONS))
+    for base, names in groups.items():
+        with tempfile.NamedTemporaryFile("w", suffix=".lst", delete=False, encoding="utf-8") as listing:
+            listing.write("".join(name + "\n" for name in names))
+        try:
+            subprocess.run(
+                ["rar", "a", "-idq", f"-m{level}", f"-mt{workers or os.cpu_count() or 1}",
+                 f"-ms{stored}", output_file, f"@{listing.name}"],
+                check=True, cwd=base,
+            )
+        finally:
+            os.remove(listing.name)
+    return _archive_stats(files, bytes_in, output_file, start)
 
 
-def extract_rar(input_file, output_dir):
+def extract_rar(input_file, output_dir, members=None):
+    import rarfile
+
     with rarfile.RarFile(input_file, "r") as rarf:
-        rarf.extractall(output_dir)
+        names = _match_members(rarf.namelist(), members)
+        rarf.extractall(output_dir, names)
+    return names
+
 
+def compress_7z(input_file, output_file, filters=None):
+    # py7zr streams each file through one filter chain for the whole archive,
+    # so there is no per-extension store or parallel mode here.
+    import py7zr
 
-def compress_7z(input_file, output_file):
-    with py7zr.SevenZipFile(output_file, "w") as szf:
-        szf.write(input_file, os.path.basename(input_file))
+    start = time.perf_counter()
+    files = 0
+    bytes_in = 0
+    with py7zr.SevenZipFile(output_file, "w", filters=filters) as szf:
+        for path, arcname in _iter_archive_inputs(input_file):
+            szf.write(path, arcname)
+            if os.path.isfile(path):
+                files += 1
+                bytes_in += os.path.getsize(path)
+    return _archive_stats(files, bytes_in, output_file, start)
 
 
-def extract_7z(input_file, output_dir):
+def extract_7z(input_file, output_dir, members=None):
+    import py7zr
+
     with py7zr.SevenZipFile(input_file, "r") as szf:
-        szf.extractall(output_dir)
+        names = _match_members(szf.getnames(), members)
+        if members is None:
+            szf.extractall(output_dir)
+        else:
+            szf.extract(output_dir, targets=names)
+    return names
 
 def pdf_to_word(pdf_file, docx_file):
+    from pdf2docx import Converter
+
     cv = Converter(pdf_file)
     cv.convert(docx_file)
     cv.close()
 
-def images_to_pdf(image_files, pdf_file):
+def _pdf_image_data(image_file):
+    # Returns (jpeg_bytes, width, height, colorspace) for one PDF page. Baseline
+    # RGB/grayscale JPEGs are embedded as they are, everything else is decoded
+    # once and re-encoded, which is what PIL's PDF writer does too.
+    import io
+    from PIL import Image
+
+    with Image.open(image_file) as img:
+        width, height = img.size
+        if img.format == "JPEG" and img.mode in ("RGB", "L"):
+            colorspace = "DeviceRGB" if img.mode == "RGB" else "DeviceGray"
+            if hasattr(image_file, "read"):
+                image_file.seek(0)
+                return image_file.read(), width, height, colorspace
+            with open(image_file, "rb") as file:
+                return file.read(), width, height, colorspace
+
+        if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+            rgba = img.convert("RGBA")
+            page = Image.new("RGB", img.size, (255, 255, 255))
+            page.paste(rgba, mask=rgba.split()[3])
+        elif img.mode in ("RGB", "L"):
+            page = img
+        else:
+            page = img.convert("RGB")
+        buffer = io.BytesIO()
+        page.save(buffer, "JPEG")
+        colorspace = "DeviceGray" if page.mode == "L" else "DeviceRGB"
+        return buffer.getvalue(), width, height, colorspace
+
+
+def _images_to_pdf_incremental(image_files, pdf_file, resolution=100.0):
+    # Writes the PDF object by object so only one decoded image is alive at a
+    # time. Object 1 is the catalog and 2 the page tree, written last once all
+    # page ids are known; the xref table makes the order irrelevant.
+    offsets = {}
+    page_ids = []
+    next_id = 3
+
+    with open(pdf_file, "wb") as out:
+        def write_object(number, header, stream=None):
+            offsets[number] = out.tell()
+            out.write(b"%d 0 obj\n%s\n" % (number, header))
+            if stream is not None:
+                out.write(b"stream\n")
+                out.write(stream)
+                out.write(b"\nendstream\n")
+            out.write(b"endobj\n")
+
+        out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        for image_file in image_files:
+            data, width, height, colorspace = _pdf_image_data(image_file)
+            image_id, content_id, page_id = next_id, next_id + 1, next_id + 2
+            next_id += 3
+            page_width = width * 72.0 / resolution
+            page_height = height * 72.0 / resolution
+
+            write_object(
+                image_id,
+                b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /%s "
+                b"/BitsPerComponent 8 /Filter /DCTDecode /Length %d >>"
+                % (width, height, colorspace.encode(), len(data)),
+                data,
+            )
+            content = b"q %.4f 0 0 %.4f 0 0 cm /Im0 Do Q" % (page_width, page_height)
+            write_object(content_id, b"<< /Length %d >>" % len(content), content)
+            write_object(
+                page_id,
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.4f %.4f] "
+                b"/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>"
+                % (page_width, page_height, image_id, content_id),
+            )
+            page_ids.append(page_id)
+
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+        write_object(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids)))
+        write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref_offset = out.tell()
+        out.write(b"xref\n0 %d\n0000000000 65535 f \n" % next_id)
+        for number in range(1, next_id):
+            out.write(b"%010d 00000 n \n" % offsets[number])
+        out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (next_id, xref_offset))
+
+
+def images_to_pdf(image_files, pdf_file, incremental=False):
+    if incremental:
+        if not image_files:
+            raise ValueError("No valid images found to convert to PDF")
+        _images_to_pdf_incremental(image_files, pdf_file)
+        return
+
+    from PIL import Image
+
     images = []
     for image_file in image_files:
         img = Image.open(image_file)
@@ -320,9 +1984,20 @@ def images_to_pdf(image_files, pdf_file):
         raise ValueError("No valid images found to convert to PDF")
 
 def html_to_pdf(html_file, pdf_file):
+    import pdfkit
+
     pdfkit.from_file(html_file, pdf_file)
 
-def extract_audio_from_video(video_file, audio_file):
+def extract_audio_from_video(video_file, audio_file, **options):
+    # transcode() drops the video stream for audio containers and stream-copies
+    # the audio track when the target container accepts its codec, so nothing
+    # is decoded in the common .mp4 -> .m4a/.aac case.
+    if ffmpeg_executable():
+        transcode(video_file, audio_file, **options)
+        return
+
+    from moviepy.editor import VideoFileClip
+
     video = None
     audio = None
     try:
@@ -335,169 +2010,1330 @@ def extract_audio_from_video(video_file, audio_file):
         if video:
             video.close()
 
-def batch_convert(input_dir, output_dir, input_ext, output_ext):
-    for filename in os.listdir(input_dir):
-        if filename.endswith(input_ext):
-            input_path = os.path.join(input_dir, filename)
-            output_path = os.path.join(output_dir, f"{os.path.splitext(filename)[0]}{output_ext}")
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tiff", ".heic", ".webp", ".gif", ".bmp")
+IMAGE_OUTPUT_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tiff", ".webp", ".gif", ".bmp", ".pdf")
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv", ".webm", ".flv", ".wmv")
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".ogg", ".flac", ".aac", ".m4a", ".wma")
+DATA_EXTENSIONS = (".json", ".ndjson", ".jsonl", ".yaml", ".csv", ".xlsx")
+COLUMNAR_EXTENSIONS = (".parquet", ".feather", ".arrow")
+# Formats pyarrow reads and writes itself.
+ARROW_EXTENSIONS = COLUMNAR_EXTENSIONS + (".csv", ".ndjson", ".jsonl")
+
+
+def _has_command(name):
+    import shutil
+
+    return shutil.which(name) is not None
+
+
+def _has_module(name):
+    import importlib.util
+
+    return importlib.util.find_spec(name) is not None
+
+
+# Availability checks per backend. Backends not listed here only need the
+# standard library.
+_BACKENDS = {
+    "pillow": lambda: _has_module("PIL"),
+    "pymupdf": lambda: _has_module("fitz"),
+    "pdf2image": lambda: _has_module("pdf2image") and check_command("pdftoppm", "-v"),
+    "docx2pdf": lambda: _has_module("docx2pdf") and sys.platform in ("win32", "darwin"),
+    "pandas": lambda: _has_module("pandas"),
+    "pyarrow": lambda: _has_module("pyarrow"),
+    "pypdf2": lambda: _has_module("PyPDF2"),
+    "python-docx": lambda: _has_module("docx"),
+    "markdown": lambda: _has_module("markdown"),
+    "pdf2docx": lambda: _has_module("pdf2docx"),
+    "pdfkit": lambda: _has_module("pdfkit") and check_command("wkhtmltopdf"),
+    "moviepy": lambda: _has_module("moviepy"),
+    "ffmpeg": lambda: ffmpeg_executable() is not None,
+    "cairosvg": lambda: _has_module("cairosvg"),
+    "pandoc": lambda: check_command("pandoc"),
+    "calibre": lambda: check_command("ebook-convert"),
+    "libreoffice": lambda: check_command("soffice"),
+    "rarfile": lambda: _has_module("rarfile"),
+    "rar": lambda: _has_command("rar"),
+    "py7zr": lambda: _has_module("py7zr"),
+}
+
+
+@lru_cache(maxsize=None)
+def backend_available(backend):
+    check = _BACKENDS.get(backend)
+    return check is None or bool(check())
+
+
+# (input_ext, output_ext) -> converter entries sorted by cost. "*" on either
+# side matches any extension (archives compress anything and extract to a
+# directory).
+_CONVERTERS = {}
+
+
+# command, when given, builds the argv of an external tool that performs the
+# same conversion; convert_file_async runs it without blocking the event loop.
+def register_converter(input_exts, output_exts, func, backend="stdlib", cost=100, command=None, streams=False):
+    # streams marks converters that also accept a readable binary file object
+    # (with a .name carrying the extension) in place of the input path.
+    if isinstance(input_exts, str):
+        input_exts = (input_exts,)
+    if isinstance(output_exts, str):
+        output_exts = (output_exts,)
+    for input_ext in input_exts:
+        for output_ext in output_exts:
+            entries = _CONVERTERS.setdefault((input_ext, output_ext), [])
+            entries.append({"func": func, "backend": backend, "cost": cost, "command": command, "streams": streams})
+            entries.sort(key=lambda entry: entry["cost"])
+
+
+def _accepts_options(func, options):
+    import inspect
+
+    try:
+        parameters = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return True
+    if any(parameter.kind == parameter.VAR_KEYWORD for parameter in parameters.values()):
+        return True
+    return all(name in parameters for name in options)
+
+
+# options, when given, skips converters that do not take those keyword
+# arguments (the streaming CSV/JSON converters have no chunksize, say).
+def find_converter(input_ext, output_ext, options=None):
+    entries = (
+        _CONVERTERS.get((input_ext, output_ext))
+        or _CONVERTERS.get(("*", output_ext))
+        or _CONVERTERS.get((input_ext, "*"))
+    )
+    if not entries:
+        return None
+    if options:
+        entries = [entry for entry in entries if _accepts_options(entry["func"], options)] or entries
+    for entry in entries:
+        if backend_available(entry["backend"]):
+            return entry
+    # Nothing usable is installed; hand back the preferred converter so it can
+    # raise its own "X is not available" error.
+    return entries[0]
+
+
+def image_to_pdf(image_file, pdf_file, **options):
+    images_to_pdf([image_file], pdf_file, **options)
+
+
+register_converter((".png", ".jpg", ".jpeg", ".tiff"), ".pdf", image_to_pdf, "pillow", cost=10, streams=True)
+register_converter(IMAGE_EXTENSIONS, IMAGE_OUTPUT_EXTENSIONS, convert_image, "pillow", cost=20, streams=True)
+register_converter(".svg", (".png", ".jpg", ".jpeg", ".tiff"), convert_svg, "cairosvg")
+register_converter((".docx", ".doc", ".odt", ".rtf", ".pptx", ".ppt", ".odp"), ".pdf", office_to_pdf, "libreoffice", cost=5)
+register_converter(".docx", ".pdf", word_to_pdf, "docx2pdf", cost=10)
+register_converter(".docx", ".pdf", convert_docx_to_pdf, "docx2pdf", cost=20)
+register_converter(".txt", ".docx", text_to_word, "python-docx")
+register_converter(".pdf", ".txt", pdf_to_text, "pypdf2")
+register_converter(".pdf", ".docx", pdf_to_word, "pdf2docx")
+register_converter(".pdf", (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".pdf"), convert_pdf, "pymupdf", cost=10)
+register_converter(".pdf", (".png", ".jpg", ".jpeg", ".tif", ".tiff"), convert_pdf_to_image, "pdf2image", cost=20)
+register_converter(".md", ".html", markdown_to_html, "markdown")
+register_converter(".md", ".pdf", markdown_to_pdf, "pandoc", command=_markdown_to_pdf_command)
+register_converter(".html", ".md", html_to_markdown, "pandoc", command=_html_to_markdown_command)
+register_converter(".html", ".pdf", html_to_pdf, "pdfkit")
+register_converter(".epub", ".pdf", epub_to_pdf, "calibre", command=_epub_to_pdf_command)
+register_converter(VIDEO_EXTENSIONS, VIDEO_EXTENSIONS, convert_video, "ffmpeg", command=_ffmpeg_command)
+register_converter(
+    VIDEO_EXTENSIONS, AUDIO_EXTENSIONS, extract_audio_from_video, "ffmpeg", cost=10, command=_ffmpeg_command
+)
+register_converter(VIDEO_EXTENSIONS, (".mp3", ".wav"), extract_audio_from_video, "moviepy", cost=20)
+register_converter(AUDIO_EXTENSIONS, AUDIO_EXTENSIONS, convert_audio, "ffmpeg", command=_ffmpeg_command)
+# convert_data_format goes first for table formats so values keep the types
+# pandas infers; the single-purpose converters are fallbacks, except for
+# CSV <-> NDJSON where the streaming converters win to keep memory flat.
+# CSV <-> JSON streams with chunksize, or by calling csv_to_json/json_to_csv
+# directly (values then stay text, as in the CSV).
+register_converter(DATA_EXTENSIONS, DATA_EXTENSIONS, convert_data_format, "pandas", cost=10, streams=True)
+# Columnar formats need pyarrow whichever side they are on; pairs pyarrow can
+# read and write on its own skip pandas entirely.
+register_converter(
+    COLUMNAR_EXTENSIONS, DATA_EXTENSIONS + COLUMNAR_EXTENSIONS, convert_data_format, "pyarrow", cost=10, streams=True
+)
+register_converter(DATA_EXTENSIONS, COLUMNAR_EXTENSIONS, convert_data_format, "pyarrow", cost=10, streams=True)
+register_converter(".xml", (".json", ".ndjson", ".jsonl", ".csv"), convert_xml, "stdlib", cost=5, streams=True)
+register_converter(".xml", (".yaml", ".xlsx"), convert_xml, "pandas", cost=5, streams=True)
+register_converter(".xlsx", ".csv", excel_to_csv, "pandas", cost=20)
+register_converter(".csv", ".xlsx", csv_to_excel, "pandas", cost=20)
+register_converter(".csv", ".json", csv_to_json, cost=20)
+register_converter(".json", ".csv", json_to_csv, cost=20)
+register_converter(".csv", (".ndjson", ".jsonl"), csv_to_ndjson, cost=5)
+register_converter((".ndjson", ".jsonl"), ".csv", json_to_csv, cost=5)
+register_converter(".json", ".yaml", json_to_yaml, cost=20)
+register_converter(".yaml", ".json", yaml_to_json, cost=20)
+register_converter("*", ".zip", compress_zip)
+register_converter(".zip", "*", extract_zip)
+register_converter("*", ".rar", compress_rar, "rar")
+register_converter(".rar", "*", extract_rar, "rarfile")
+register_converter("*", ".7z", compress_7z, "py7zr")
+register_converter(".7z", "*", extract_7z, "py7zr")
+
+
+_BACKEND_DISTRIBUTIONS = {
+    "pillow": "pillow",
+    "pymupdf": "PyMuPDF",
+    "pdf2image": "pdf2image",
+    "docx2pdf": "docx2pdf",
+    "pandas": "pandas",
+    "pyarrow": "pyarrow",
+    "pypdf2": "PyPDF2",
+    "python-docx": "python-docx",
+    "markdown": "Markdown",
+    "pdf2docx": "pdf2docx",
+    "pdfkit": "pdfkit",
+    "moviepy": "moviepy",
+    "cairosvg": "CairoSVG",
+    "rarfile": "rarfile",
+    "py7zr": "py7zr",
+}
+
+_BACKEND_COMMANDS = {
+    "ffmpeg": ["ffmpeg", "-version"],
+    "pandoc": ["pandoc", "--version"],
+    "calibre": ["ebook-convert", "--version"],
+    "libreoffice": ["soffice", "--version"],
+}
+
+
+@lru_cache(maxsize=None)
+def backend_version(backend):
+    if backend in _BACKEND_COMMANDS:
+        try:
+            output = subprocess.run(
+                _BACKEND_COMMANDS[backend], capture_output=True, text=True, check=True
+            ).stdout
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return None
+        return output.splitlines()[0] if output else None
+    if backend in _BACKEND_DISTRIBUTIONS:
+        from importlib import metadata
+
+        try:
+            return metadata.version(_BACKEND_DISTRIBUTIONS[backend])
+        except metadata.PackageNotFoundError:
+            return None
+    return sys.version.split()[0]
+
+
+# Optional content-addressed cache consulted by convert_file; see enable_cache.
+_cache = None
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+# Keys this process stored, so worker results can hand them to the parent.
+_cache_stored = []
+
+
+# Entries are keyed on the input content hash, target extension, converter
+# options and backend version. Least recently used entries are evicted once the
+# store exceeds max_bytes or has gone unused for max_age seconds. With
+# link=True hits are hardlinked into place, so outputs must not be modified in
+# place.
+def enable_cache(cache_dir, max_bytes=None, max_age=None, link=True):
+    global _cache
+    from collections import OrderedDict
+
+    objects_dir = os.path.join(cache_dir, "objects")
+    os.makedirs(objects_dir, exist_ok=True)
+    found = []
+    for shard in os.scandir(objects_dir):
+        if shard.is_dir():
+            for entry in os.scandir(shard.path):
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name, entry.path, stat.st_size))
+    index = OrderedDict()
+    for mtime, name, path, size in sorted(found):
+        index[name] = {"path": path, "size": size, "used": mtime}
+
+    with _cache_lock:
+        _cache = {
+            "dir": objects_dir,
+            "max_bytes": max_bytes,
+            "max_age": max_age,
+            "link": link,
+            "index": index,
+            "size": sum(entry["size"] for entry in index.values()),
+        }
+        _evict_cache()
+
+
+def disable_cache():
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def cache_stats():
+    with _cache_lock:
+        stats = dict(_cache_stats)
+        if _cache is not None:
+            stats["entries"] = len(_cache["index"])
+            stats["size"] = _cache["size"]
+    return stats
+
+
+def _hash_file(path, digest):
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+
+
+def _cache_key(input_paths, output_ext, converter, options):
+    import hashlib
+
+    digest = hashlib.sha256()
+    for path in input_paths:
+        _hash_file(path, digest)
+        digest.update(b"\0")
+    backend = converter["backend"]
+    meta = [output_ext, converter["func"].__name__, backend, backend_version(backend), options]
+    digest.update(json.dumps(meta, sort_keys=True, default=str).encode())
+    return digest.hexdigest() + output_ext
+
+
+def _cache_fetch(key, output_path):
+    import shutil
+
+    with _cache_lock:
+        entry = _cache["index"].get(key)
+        if entry is None:
+            # Stored by a worker process or another process sharing the store.
+            entry = _adopt_cache_object(key)
+        if entry is None:
+            _cache_stats["misses"] += 1
+            return False
+        _cache["index"].move_to_end(key)
+        entry["used"] = time.time()
+        link = _cache["link"]
+    try:
+        os.utime(entry["path"])
+        if os.path.lexists(output_path):
+            os.remove(output_path)
+        if link:
             try:
-                convert_file(input_path, output_path)
-                print(f"Converted {filename} successfully.")
-            except Exception as e:
-                print(f"Failed to convert {filename}: {str(e)}")
+                os.link(entry["path"], output_path)
+            except OSError:
+                shutil.copyfile(entry["path"], output_path)
+        else:
+            shutil.copyfile(entry["path"], output_path)
+    except FileNotFoundError:
+        # Evicted by another process sharing the store.
+        with _cache_lock:
+            if _cache["index"].pop(key, None) is not None:
+                _cache["size"] -= entry["size"]
+            _cache_stats["misses"] += 1
+        return False
+    with _cache_lock:
+        _cache_stats["hits"] += 1
+    return True
+
+
+def _cache_store(key, output_path):
+    import shutil
+
+    shard = os.path.join(_cache["dir"], key[:2])
+    os.makedirs(shard, exist_ok=True)
+    path = os.path.join(shard, key)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.copyfile(output_path, temp_path)
+    os.replace(temp_path, path)
+    size = os.path.getsize(path)
+    with _cache_lock:
+        previous = _cache["index"].pop(key, None)
+        if previous is not None:
+            _cache["size"] -= previous["size"]
+        _cache["index"][key] = {"path": path, "size": size, "used": time.time()}
+        _cache["size"] += size
+        _cache_stored.append(key)
+        _evict_cache()
+
+
+def _adopt_cache_object(key):
+    # Caller holds _cache_lock. Indexes an object found on disk.
+    path = os.path.join(_cache["dir"], key[:2], key)
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return None
+    entry = {"path": path, "size": size, "used": time.time()}
+    _cache["index"][key] = entry
+    _cache["size"] += size
+    return entry
+
+
+def _cache_delta(before):
+    # What one job did to this process's cache, for _merge_cache_delta.
+    with _cache_lock:
+        delta = {name: _cache_stats[name] - before[name] for name in before}
+        delta["stored"] = list(_cache_stored)
+        delta["pid"] = os.getpid()
+        _cache_stored.clear()
+    return delta
+
+
+def _merge_cache_delta(delta):
+    # Folds a worker's cache activity into this process: the counters, and the
+    # objects it stored so max_bytes covers the whole store. Jobs that ran
+    # in-process are already counted.
+    if not delta or delta["pid"] == os.getpid():
+        return
+    with _cache_lock:
+        for name in _cache_stats:
+            _cache_stats[name] += delta[name]
+        if _cache is None:
+            return
+        for key in delta["stored"]:
+            if key not in _cache["index"]:
+                _adopt_cache_object(key)
+        _evict_cache()
+
+
+def _evict_cache():
+    # Caller holds _cache_lock. The index is ordered oldest use first.
+    index = _cache["index"]
+    cutoff = time.time() - _cache["max_age"] if _cache["max_age"] else None
+    while index:
+        key, entry = next(iter(index.items()))
+        too_old = cutoff is not None and entry["used"] < cutoff
+        too_big = _cache["max_bytes"] is not None and _cache["size"] > _cache["max_bytes"]
+        if not (too_old or too_big):
+            break
+        del index[key]
+        _cache["size"] -= entry["size"]
+        _cache_stats["evictions"] += 1
+        try:
+            os.remove(entry["path"])
+        except FileNotFoundError:
+            pass
+
+
+@contextmanager
+def _time_limit(seconds):
+    # SIGALRM only exists on POSIX and can only be armed from the main thread,
+    # which is where ProcessPoolExecutor workers run their jobs.
+    if not seconds or not hasattr(signal, "SIGALRM") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def handler(signum, frame):
+        raise TimeoutError(f"Conversion timed out after {seconds} seconds")
+
+    previous = signal.signal(signal.SIGALRM, handler)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _output_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    if os.path.isdir(path):
+        return sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, names in os.walk(path)
+            for name in names
+        )
+    return None
+
+
+def _convert_job(input_path, output_path, timeout=None, options=None):
+    # Runs in a worker process, so the metrics record travels back in the
+    # result and the caller's hooks see it there.
+    options = dict(options or {})
+    options.pop("metrics", None)
+    profile = options.pop("profile", None)
+    record = _metrics_record(input_path, output_path)
+    result = {
+        "input": input_path,
+        "output": output_path,
+        "status": "ok",
+        "duration": 0.0,
+        "error": None,
+        "output_size": None,
+        "metrics": record,
+        "cache": None,
+    }
+    with _cache_lock:
+        before = dict(_cache_stats)
+        _cache_stored.clear()
+    start = time.perf_counter()
+    try:
+        with _time_limit(timeout), _measured(record, profile):
+            _convert_file(input_path, output_path, record, **options)
+        result["output_size"] = record["output_bytes"]
+    except TimeoutError as e:
+        result["status"] = "timeout"
+        result["error"] = str(e)
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+    result["duration"] = time.perf_counter() - start
+    result["cache"] = _cache_delta(before)
+    return result
+
+
+def _run_jobs(func, jobs, workers=None, max_in_flight=None):
+    # Yields (index, result) pairs in completion order. At most max_in_flight
+    # jobs are submitted to the pool at once so huge job lists stay cheap.
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for index, args in enumerate(jobs):
+            yield index, func(*args)
+        return
+
+    max_in_flight = max_in_flight or workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        for index, args in enumerate(jobs):
+            pending[executor.submit(func, *args)] = index
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+        for future in as_completed(pending):
+            yield pending[future], future.result()
+
+
+def _file_digest(path):
+    import hashlib
+
+    digest = hashlib.sha256()
+    _hash_file(path, digest)
+    return digest.hexdigest()
+
+
+def _converter_version(input_ext, output_ext, options):
+    # Changes when the converter, its backend version or the options change,
+    # which invalidates every output made with the old one.
+    converter = find_converter(input_ext, output_ext, options)
+    if converter is None:
+        return None
+    backend = converter["backend"]
+    meta = [converter["func"].__name__, backend, backend_version(backend), options]
+    return json.dumps(meta, sort_keys=True, default=str)
+
+
+def _load_manifest(manifest):
+    try:
+        with open(manifest, "r") as file:
+            return json.load(file)["files"]
+    except FileNotFoundError:
+        return {}
+
+
+def _save_manifest(manifest, files):
+    # Written next to the old one and renamed, so an interrupted run leaves the
+    # previous manifest intact.
+    temp_path = f"{manifest}.tmp"
+    with open(temp_path, "w") as file:
+        json.dump({"version": 1, "files": files}, file)
+    os.replace(temp_path, manifest)
+
+
+def _manifest_current(previous, record, input_path, output_exists):
+    if (
+        previous is None
+        or previous["converter"] != record["converter"]
+        or previous["output"] != record["output"]
+        or previous["size"] != record["size"]
+        or not output_exists(record["output"])
+    ):
+        return False
+    if previous["mtime"] == record["mtime"]:
+        record["hash"] = previous["hash"]
+        return True
+    # Touched but possibly unchanged (checkouts, copies): compare content.
+    record["hash"] = _file_digest(input_path)
+    return record["hash"] == previous["hash"]
+
+
+def _extension_map(input_ext, output_ext):
+    # input_ext is one extension, a sequence of them (all mapped to
+    # output_ext) or a {input_ext: output_ext} dict. Longest first, so
+    # ".tar.gz" wins over ".gz".
+    if isinstance(input_ext, dict):
+        mapping = input_ext
+    elif isinstance(input_ext, str):
+        mapping = {input_ext: output_ext}
+    else:
+        mapping = dict.fromkeys(input_ext, output_ext)
+    if any(target is None for target in mapping.values()):
+        raise ValueError("No output extension given")
+    return sorted(((ext.lower(), target) for ext, target in mapping.items()), key=lambda item: -len(item[0]))
+
+
+def _glob_match(path, patterns):
+    import fnmatch
+
+    path = path.lower()
+    return any(fnmatch.fnmatchcase(path, pattern.lower()) for pattern in patterns)
+
+
+def _discover_files(input_dir, mapping, recursive=False, include=None, exclude=None):
+    # Yields (entry, relative path, input ext, output ext), walking with
+    # os.scandir so the directory entries double as the stat cache.
+    # Extensions and globs match case-insensitively; globs apply to the
+    # "/"-separated path relative to input_dir, and an excluded directory is
+    # not descended into.
+    stack = [""]
+    while stack:
+        relative_dir = stack.pop()
+        with os.scandir(os.path.join(input_dir, relative_dir)) as entries:
+            entries = sorted(entries, key=lambda entry: entry.name)
+        subdirs = []
+        for entry in entries:
+            relative = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+            if exclude and _glob_match(relative, exclude):
+                continue
+            if entry.is_dir():
+                if recursive:
+                    subdirs.append(relative)
+                continue
+            if not entry.is_file() or (include and not _glob_match(relative, include)):
+                continue
+            name = entry.name.lower()
+            for ext, target in mapping:
+                if name.endswith(ext):
+                    yield entry, relative, ext, target
+                    break
+        stack.extend(reversed(subdirs))
+
+
+def batch_convert(input_dir, output_dir, input_ext, output_ext=None, workers=None, max_in_flight=None,
+                  timeout=None, manifest=None, prune=False, recursive=False, include=None, exclude=None,
+                  largest_first=True, **options):
+    # With a manifest, inputs whose size and mtime (or content hash), converter
+    # version and output are unchanged since the last run are skipped, and
+    # prune deletes outputs whose inputs have gone away. recursive mirrors the
+    # input tree under output_dir. Jobs are submitted largest input first so a
+    # parallel run does not end waiting on one big straggler; results stay in
+    # discovery order.
+    if prune and not manifest:
+        raise ValueError("prune needs a manifest")
+    mapping = _extension_map(input_ext, output_ext)
+    files = list(_discover_files(input_dir, mapping, recursive, include, exclude))
+
+    previous = _load_manifest(manifest) if manifest else {}
+    versions = {}
+    listings = {}
+
+    def output_exists(path):
+        directory, name = os.path.split(path)
+        if directory not in listings:
+            try:
+                with os.scandir(directory) as entries:
+                    listings[directory] = {entry.name for entry in entries}
+            except FileNotFoundError:
+                listings[directory] = set()
+        return name in listings[directory]
+
+    records = {}
+    results = [None] * len(files)
+    jobs = []
+    output_dirs = set()
+    for index, (entry, relative, ext, target) in enumerate(files):
+        input_path = os.path.join(input_dir, *relative.split("/"))
+        output_path = os.path.join(output_dir, *relative.split("/"))[:-len(ext)] + target
+        if manifest:
+            if (ext, target) not in versions:
+                versions[ext, target] = _converter_version(ext, target.lower(), options)
+            stat = entry.stat()
+            record = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime_ns,
+                "hash": None,
+                "converter": versions[ext, target],
+                "output": output_path,
+            }
+            records[input_path] = record
+            if _manifest_current(previous.get(input_path), record, input_path, output_exists):
+                results[index] = {
+                    "input": input_path,
+                    "output": output_path,
+                    "status": "skipped",
+                    "duration": 0.0,
+                    "error": None,
+                    "output_size": None,
+                    "metrics": None,
+                }
+                continue
+        if os.path.dirname(output_path) not in output_dirs:
+            output_dirs.add(os.path.dirname(output_path))
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        jobs.append((entry.stat().st_size if largest_first else 0, index, (input_path, output_path, timeout, options)))
+
+    if largest_first:
+        jobs.sort(key=lambda job: -job[0])
+    job_indices = [index for _, index, _ in jobs]
+    jobs = [args for _, _, args in jobs]
+
+    for job_index, result in _run_jobs(_convert_job, jobs, workers, max_in_flight):
+        results[job_indices[job_index]] = result
+        _emit_metrics(result["metrics"])
+        _merge_cache_delta(result["cache"])
+
+    if manifest:
+        current = set(records)
+        for result in results:
+            record = records[result["input"]]
+            if result["status"] in ("failed", "timeout"):
+                # Left out so the next run retries it.
+                del records[result["input"]]
+            elif record["hash"] is None:
+                record["hash"] = _file_digest(result["input"])
+        for input_path, record in previous.items():
+            if input_path in current:
+                continue
+            # Inputs left out by include/exclude keep their entries. Only an
+            # input that is gone makes its output an orphan; unpruned orphans
+            # stay in the manifest for a later prune run to find.
+            if not prune or os.path.exists(input_path):
+                records[input_path] = record
+                continue
+            if os.path.exists(record["output"]):
+                os.remove(record["output"])
+            results.append({
+                "input": input_path,
+                "output": record["output"],
+                "status": "pruned",
+                "duration": 0.0,
+                "error": None,
+                "output_size": None,
+                "metrics": None,
+            })
+        _save_manifest(manifest, records)
+    return results
+
+
+# "archive.zip!/pattern" names members of an archive, for input or output.
+_ARCHIVE_MEMBER_PATH = re.compile(r"^(.+?\.(?:zip|rar|7z))!/(.*)$", re.IGNORECASE)
+
+
+def _split_member_path(path):
+    match = _ARCHIVE_MEMBER_PATH.match(path) if isinstance(path, str) else None
+    return match.groups() if match else None
+
+
+def _convert_member(name, stream, output_path, **options):
+    input_ext = os.path.splitext(name)[1].lower()
+    output_ext = os.path.splitext(output_path)[1].lower()
+    converter = find_converter(input_ext, output_ext, options)
+    if converter is None:
+        raise ValueError(f"Unsupported conversion: {input_ext} to {output_ext}")
+    if converter["streams"]:
+        converter["func"](stream, output_path, **options)
+        return
+    # Path-only converters get the member spilled to a temporary file.
+    import shutil
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, os.path.basename(name))
+        with open(path, "wb") as file:
+            shutil.copyfileobj(stream, file, 1 << 20)
+        converter["func"](path, output_path, **options)
+
+
+def _convert_archive_members(archive, pattern, output_path, **options):
+    names = [member["name"] for member in list_archive(archive) if not member["is_dir"]]
+    names = _match_members(names, pattern)
+    if not names:
+        raise ValueError(f"No members of {archive} match {pattern!r}")
+    members = _iter_archive_members(archive, names)
+
+    target = _split_member_path(output_path)
+    if target is not None:
+        # One output per member, written into a new ZIP under the member's
+        # path with the extension of the output pattern.
+        import posixpath
+        import tempfile
+
+        output_archive, output_pattern = target
+        output_ext = os.path.splitext(output_pattern)[1].lower()
+        if os.path.splitext(output_archive)[1].lower() != ".zip":
+            raise ValueError("Converted members can only be written to a .zip archive")
+        if not output_ext:
+            raise ValueError(f"Output pattern needs an extension: {output_pattern!r}")
+        prefix = posixpath.dirname(output_pattern)
+        with tempfile.TemporaryDirectory() as tmp, \
+                zipfile.ZipFile(output_archive, "w", zipfile.ZIP_DEFLATED) as zipf:
+            for name, stream in members:
+                spill = os.path.join(tmp, "output" + output_ext)
+                _convert_member(name, stream, spill, **options)
+                zipf.write(spill, posixpath.join(prefix, posixpath.splitext(name)[0] + output_ext))
+                os.remove(spill)
+    elif len(names) == 1:
+        for name, stream in members:
+            _convert_member(name, stream, output_path, **options)
+    elif os.path.splitext(output_path)[1].lower() == ".pdf":
+        images_to_pdf((stream for _, stream in members), output_path, incremental=True)
+    else:
+        raise ValueError("Multiple input files are only supported for PDF output.")
+
+
+# Callables run with the metrics record of every conversion; see
+# add_metrics_hook.
+_metrics_hooks = []
+
+
+def add_metrics_hook(hook):
+    _metrics_hooks.append(hook)
+
+
+def remove_metrics_hook(hook):
+    _metrics_hooks.remove(hook)
+
+
+def _emit_metrics(record):
+    for hook in list(_metrics_hooks):
+        try:
+            hook(record)
+        except Exception:
+            logging.exception("Metrics hook failed")
+
+
+def _input_size(input_path):
+    paths = input_path if isinstance(input_path, list) else [input_path]
+    if not all(isinstance(path, str) and os.path.isfile(path) for path in paths):
+        return None
+    return sum(os.path.getsize(path) for path in paths)
+
+
+def _children_cpu_time():
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _reset_peak_rss():
+    # Linux lets a process reset its RSS high-water mark, so the peak read
+    # after a conversion belongs to that conversion. Elsewhere it is the
+    # process-wide peak.
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+    except OSError:
+        pass
+
+
+def _metrics_record(input_path, output_path):
+    if isinstance(input_path, list):
+        input_ext = os.path.splitext(input_path[0])[1].lower() if input_path else ""
+    else:
+        input_ext = os.path.splitext(input_path)[1].lower()
+    return {
+        "input": input_path,
+        "output": output_path,
+        "pair": f"{input_ext}->{os.path.splitext(output_path)[1].lower()}",
+        "backend": None,
+        "status": "ok",
+        "error": None,
+        "wall_time": 0.0,
+        "cpu_time": 0.0,
+        "peak_rss": None,
+        "input_bytes": _input_size(input_path),
+        "output_bytes": None,
+        "profile": None,
+    }
+
 
-def convert_file(input_path, output_path):
+@contextmanager
+def _measured(record, profile=None):
+    # Fills in timings, memory and output size, and on failure the exception
+    # class name, then re-raises. cpu_time covers this process and any tools
+    # it waited for; conversions running concurrently in one process share
+    # both counters. profile is "cprofile" or "tracemalloc" and leaves a text
+    # report in record["profile"].
+    import io
+
+    if profile not in (None, "cprofile", "tracemalloc"):
+        raise ValueError(f"Unknown profile mode: {profile}")
+    profiler = None
+    if profile == "cprofile":
+        import cProfile
+
+        profiler = cProfile.Profile()
+    elif profile == "tracemalloc":
+        import tracemalloc
+
+        tracemalloc.start()
+
+    _reset_peak_rss()
+    start = time.perf_counter()
+    cpu_start = time.process_time() + _children_cpu_time()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield record
+    except BaseException as e:
+        record["status"] = "failed"
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        record["wall_time"] = time.perf_counter() - start
+        record["cpu_time"] = time.process_time() + _children_cpu_time() - cpu_start
+        record["peak_rss"] = _peak_rss()
+        record["output_bytes"] = _output_size(record["output"])
+        if profiler is not None:
+            import pstats
+
+            report = io.StringIO()
+            pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(25)
+            record["profile"] = report.getvalue()
+        elif profile == "tracemalloc":
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            lines = [f"traced peak: {peak} bytes"]
+            lines += [str(stat) for stat in snapshot.statistics("lineno")[:25]]
+            record["profile"] = "\n".join(lines)
+
+
+def _percentile(values, fraction):
+    # Nearest-rank percentile, so small samples report a value that was seen.
+    import math
+
+    values = sorted(values)
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def summarize_metrics(records):
+    # Groups metrics records (or batch_convert results carrying them) by
+    # conversion pair. Cache hits and failures are counted but left out of
+    # the timing percentiles.
+    groups = {}
+    for record in records:
+        record = record.get("metrics", record) if isinstance(record, dict) else record
+        if record is None or "pair" not in record:
+            continue
+        groups.setdefault(record["pair"], []).append(record)
+
+    summary = {}
+    for pair, group in sorted(groups.items()):
+        converted = [record for record in group if record["status"] == "ok"]
+        wall = [record["wall_time"] for record in converted]
+        cpu = [record["cpu_time"] for record in converted]
+        input_bytes = sum(record["input_bytes"] or 0 for record in converted)
+        summary[pair] = {
+            "count": len(group),
+            "failed": sum(record["status"] == "failed" for record in group),
+            "cached": sum(record["status"] == "cached" for record in group),
+            "backends": sorted({record["backend"] for record in group if record["backend"]}),
+            "wall_p50": _percentile(wall, 0.5) if wall else None,
+            "wall_p95": _percentile(wall, 0.95) if wall else None,
+            "cpu_p50": _percentile(cpu, 0.5) if cpu else None,
+            "cpu_p95": _percentile(cpu, 0.95) if cpu else None,
+            "peak_rss_max": max((record["peak_rss"] or 0 for record in converted), default=None),
+            "input_bytes": input_bytes,
+            "output_bytes": sum(record["output_bytes"] or 0 for record in converted),
+            "bytes_per_second": input_bytes / sum(wall) if sum(wall) else None,
+            "errors": sorted({record["error"] for record in group if record["error"]}),
+        }
+    return summary
+
+
+def _convert_file(input_path, output_path, record, **options):
     logging.info(f"Starting conversion: {input_path} -> {output_path}")
     try:
+        source = _split_member_path(input_path)
+        if source is not None:
+            _convert_archive_members(*source, output_path, **options)
+            logging.info(f"Conversion completed successfully: {output_path}")
+            return
+
         if isinstance(input_path, list):
             input_ext = os.path.splitext(input_path[0])[1].lower()
         else:
             input_ext = os.path.splitext(input_path)[1].lower()
         output_ext = os.path.splitext(output_path)[1].lower()
 
-        if isinstance(input_path, list) and output_path.lower().endswith('.pdf'):
-            images_to_pdf(input_path, output_path)
-        elif input_ext in (".png", ".jpg", ".jpeg", ".tiff") and output_ext == ".pdf":
-            images_to_pdf([input_path], output_path)
-        elif input_ext == ".docx" and output_ext == ".pdf":
-            word_to_pdf(input_path, output_path)
-        elif input_ext == ".pdf" and output_ext == ".txt":
-            pdf_to_text(input_path, output_path)
-        elif input_ext == ".txt" and output_ext == ".docx":
-            text_to_word(input_path, output_path)
-        elif input_ext in (
-            ".png",
-            ".jpg",
-            ".jpeg",
-            ".tiff",
-            ".heic",
-            ".webp",
-            ".gif",
-            ".bmp",
-        ):
-            convert_image(input_path, output_path)
-        elif input_ext == ".pdf":
-            convert_pdf(input_path, output_path)
-        elif input_ext in (".mp4", ".mov", ".avi", ".mkv", ".webm", ".flv", ".wmv"):
-            convert_video(input_path, output_path)
-        elif input_ext == ".docx" and output_ext == ".pdf":
-            convert_docx_to_pdf(input_path, output_path)
-        elif input_ext in (".mp3", ".wav", ".ogg", ".flac", ".aac", ".m4a", ".wma"):
-            convert_audio(input_path, output_path)
-        elif input_ext in (".json", ".yaml", ".csv", ".xlsx", ".xml") and output_ext in (
-            ".json",
-            ".yaml",
-            ".csv",
-            ".xlsx",
-        ):
-            convert_data_format(input_path, output_path)
-        elif input_ext == ".svg" and output_ext in (".png", ".jpg", ".jpeg", ".tiff"):
-            convert_svg(input_path, output_path)
-        elif input_ext in (".png", ".jpg", ".jpeg", ".tiff", ".bmp", ".gif"):
-            convert_image(input_path, output_path)
-        elif input_ext == ".pdf" and output_ext in (".png", ".jpg", ".jpeg", ".tiff"):
-            convert_pdf_to_image(input_path, output_path)
-        elif input_ext == ".xlsx" and output_ext == ".csv":
-            excel_to_csv(input_path, output_path)
-        elif input_ext == ".csv" and output_ext == ".xlsx":
-            csv_to_excel(input_path, output_path)
-        elif input_ext == ".csv" and output_ext == ".json":
-            csv_to_json(input_path, output_path)
-        elif input_ext == ".json" and output_ext == ".csv":
-            json_to_csv(input_path, output_path)
-        elif input_ext == ".json" and output_ext == ".yaml":
-            json_to_yaml(input_path, output_path)
-        elif input_ext == ".yaml" and output_ext == ".json":
-            yaml_to_json(input_path, output_path)
-        elif input_ext == ".md" and output_ext == ".html":
-            markdown_to_html(input_path, output_path)
-        elif input_ext == ".md" and output_ext == ".pdf":
-            markdown_to_pdf(input_path, output_path)
-        elif input_ext == ".html" and output_ext == ".md":
-            html_to_markdown(input_path, output_path)
-        elif input_ext == ".epub" and output_ext == ".pdf":
-            epub_to_pdf(input_path, output_path)
-        elif output_ext == ".zip":
-            compress_zip(input_path, output_path)
-        elif input_ext == ".zip":
-            extract_zip(input_path, output_path)
-        elif output_ext == ".rar":
-            compress_rar(input_path, output_path)
-        elif input_ext == ".rar":
-            extract_rar(input_path, output_path)
-        elif output_ext == ".7z":
-            compress_7z(input_path, output_path)
-        elif input_ext == ".7z":
-            extract_7z(input_path, output_path)
-        elif input_ext == ".pdf" and output_ext == ".docx":
-            pdf_to_word(input_path, output_path)
-        elif input_ext == ".html" and output_ext == ".pdf":
-            html_to_pdf(input_path, output_path)
-        elif input_ext in (".mp4", ".avi", ".mov", ".mkv") and output_ext in (".mp3", ".wav"):
-            extract_audio_from_video(input_path, output_path)
+        if isinstance(input_path, list):
+            if output_ext != ".pdf":
+                raise ValueError("Multiple input files are only supported for PDF output.")
+            converter = {"func": images_to_pdf, "backend": "pillow", "cost": 0, "command": None, "streams": True}
+            inputs = input_path
         else:
-            raise ValueError(f"Unsupported conversion: {input_ext} to {output_ext}")
-        
+            converter = find_converter(input_ext, output_ext, options)
+            if converter is None:
+                raise ValueError(f"Unsupported conversion: {input_ext} to {output_ext}")
+            inputs = [input_path]
+        record["backend"] = converter["backend"]
+
+        cache_key = None
+        if _cache is not None and output_ext and all(os.path.isfile(path) for path in inputs):
+            cache_key = _cache_key(inputs, output_ext, converter, options)
+            if _cache_fetch(cache_key, output_path):
+                record["status"] = "cached"
+                logging.info(f"Served from cache: {output_path}")
+                return
+            # An earlier hit may have left output_path hardlinked to a cache
+            # object; converters writing in place would corrupt that entry.
+            if os.path.isfile(output_path):
+                os.unlink(output_path)
+
+        converter["func"](input_path, output_path, **options)
+
+        if cache_key is not None and os.path.isfile(output_path):
+            _cache_store(cache_key, output_path)
+
         logging.info(f"Conversion completed successfully: {output_path}")
     except Exception as e:
         logging.error(f"Conversion failed: {str(e)}")
         raise
 
 
-def get_supported_conversions(input_ext):
-    supported = {
-        "png": [".jpg", ".jpeg", ".tiff", ".pdf", ".svg", ".bmp", ".gif"],
-        "jpg": [".png", ".tiff", ".pdf", ".svg", ".bmp", ".gif"],
-        "jpeg": [".png", ".tiff", ".pdf", ".svg", ".bmp", ".gif"],
-        "tiff": [".png", ".jpg", ".jpeg", ".pdf", ".svg", ".bmp", ".gif"],
-        "heic": [".png", ".jpg", ".jpeg", ".tiff", ".pdf"],
-        "webp": [".png", ".jpg", ".jpeg", ".tiff", ".pdf"],
-        "gif": [".png", ".jpg", ".jpeg", ".tiff", ".pdf", ".bmp"],
-        "bmp": [".png", ".jpg", ".jpeg", ".tiff", ".pdf", ".gif"],
-        "pdf": [".png", ".jpg", ".jpeg", ".tiff", ".docx"],
-        "docx": [".pdf"],
-        "json": [".yaml", ".csv", ".xlsx"],
-        "yaml": [".json", ".csv", ".xlsx"],
-        "md": [".html", ".pdf"],
-        "html": [".md", ".pdf"],
-        "epub": [".pdf"],
-        "zip": ["."],
-        "rar": ["."],
-        "7z": ["."],
-        "mp4": [".mov", ".avi", ".mkv", ".webm", ".flv", ".wmv", ".mp3", ".wav"],
-        "mov": [".mp4", ".avi", ".mkv", ".webm", ".flv", ".wmv", ".mp3", ".wav"],
-        "avi": [".mp4", ".mov", ".mkv", ".webm", ".flv", ".wmv", ".mp3", ".wav"],
-        "mkv": [".mp4", ".mov", ".avi", ".webm", ".flv", ".wmv", ".mp3", ".wav"],
-    }
+def convert_file(input_path, output_path, metrics=False, profile=None, **options):
+    # Every call produces a metrics record for the registered hooks; metrics
+    # returns it too.
+    record = _metrics_record(input_path, output_path)
+    try:
+        with _measured(record, profile):
+            _convert_file(input_path, output_path, record, **options)
+    finally:
+        _emit_metrics(record)
+    return record if metrics else None
+
+
+# Concurrency limits for convert_file_async, per converter backend. Backends
+# without an entry share the "default" limit.
+_async_limits = {"default": os.cpu_count() or 1, "ffmpeg": 2, "pandoc": 4, "calibre": 2}
+_async_semaphores = weakref.WeakKeyDictionary()
+
+
+def set_async_limits(**limits):
+    _async_limits.update(limits)
+    _async_semaphores.clear()
+
+
+def _async_semaphore(backend):
+    import asyncio
+
+    # Semaphores belong to one event loop, so keep a set per running loop.
+    semaphores = _async_semaphores.setdefault(asyncio.get_running_loop(), {})
+    if backend not in _async_limits:
+        backend = "default"
+    if backend not in semaphores:
+        semaphores[backend] = asyncio.Semaphore(_async_limits[backend])
+    return semaphores[backend]
+
+
+async def _run_command_async(command):
+    import asyncio
+
+    process = await asyncio.create_subprocess_exec(
+        *command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    try:
+        _, stderr = await process.communicate()
+    except BaseException:
+        # Cancelled or timed out: don't leave the tool running.
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+    if process.returncode != 0:
+        message = stderr.decode(errors="replace").strip().splitlines()[-1:] or [""]
+        raise RuntimeError(f"{command[0]} exited with status {process.returncode}: {message[0]}")
 
-    if ffmpeg_available:
-        supported.update(
-            {
-                "mp4": [".mov", ".avi", ".mkv", ".webm", ".flv", ".wmv"],
-                "mov": [".mp4", ".avi", ".mkv", ".webm", ".flv", ".wmv"],
-                "avi": [".mp4", ".mov", ".mkv", ".webm", ".flv", ".wmv"],
-                "mkv": [".mp4", ".mov", ".avi", ".webm", ".flv", ".wmv"],
-                "webm": [".mp4", ".mov", ".avi", ".mkv", ".flv", ".wmv"],
-                "flv": [".mp4", ".mov", ".avi", ".mkv", ".webm", ".wmv"],
-                "wmv": [".mp4", ".mov", ".avi", ".mkv", ".webm", ".flv"],
-                "mp3": [".wav", ".ogg", ".flac", ".aac", ".m4a", ".wma"],
-                "wav": [".mp3", ".ogg", ".flac", ".aac", ".m4a", ".wma"],
-                "ogg": [".mp3", ".wav", ".flac", ".aac", ".m4a", ".wma"],
-                "flac": [".mp3", ".wav", ".ogg", ".aac", ".m4a", ".wma"],
-                "aac": [".mp3", ".wav", ".ogg", ".flac", ".m4a", ".wma"],
-                "m4a": [".mp3", ".wav", ".ogg", ".flac", ".aac", ".wma"],
-                "wma": [".mp3", ".wav", ".ogg", ".flac", ".aac", ".m4a"],
+
+async def convert_file_async(input_path, output_path, timeout=None, executor=None, **options):
+    import asyncio
+    from functools import partial
+
+    if isinstance(input_path, list):
+        backend, command = "pillow", None
+    else:
+        input_ext = os.path.splitext(input_path)[1].lower()
+        output_ext = os.path.splitext(output_path)[1].lower()
+        converter = find_converter(input_ext, output_ext, options)
+        if converter is None:
+            raise ValueError(f"Unsupported conversion: {input_ext} to {output_ext}")
+        backend, command = converter["backend"], converter["command"]
+
+    # Archive member paths and options the argv builder does not take (a
+    # progress callback, say) need convert_file.
+    use_command = (
+        command is not None
+        and _accepts_options(command, options)
+        and _split_member_path(input_path) is None
+        and _split_member_path(output_path) is None
+    )
+    async with _async_semaphore(backend):
+        if use_command and backend_available(backend):
+            logging.info(f"Starting conversion: {input_path} -> {output_path}")
+            record = _metrics_record(input_path, output_path)
+            record["backend"] = backend
+            try:
+                with _measured(record):
+                    # Building the argv may probe the input and the cache
+                    # hashes it, so both stay off the event loop.
+                    cache_key = None
+                    if _cache is not None and output_ext and os.path.isfile(input_path):
+                        cache_key = await asyncio.to_thread(_cache_key, [input_path], output_ext, converter, options)
+                        if await asyncio.to_thread(_cache_fetch, cache_key, output_path):
+                            record["status"] = "cached"
+                            logging.info(f"Served from cache: {output_path}")
+                            return
+                        if os.path.isfile(output_path):
+                            os.unlink(output_path)
+                    argv = await asyncio.to_thread(command, input_path, output_path, **options)
+                    await asyncio.wait_for(_run_command_async(argv), timeout)
+                    if cache_key is not None and os.path.isfile(output_path):
+                        await asyncio.to_thread(_cache_store, cache_key, output_path)
+            finally:
+                _emit_metrics(record)
+            logging.info(f"Conversion completed successfully: {output_path}")
+        else:
+            # In-process converters run on the executor; a timeout or cancel
+            # stops waiting but cannot interrupt the converter itself.
+            loop = asyncio.get_running_loop()
+            job = loop.run_in_executor(executor, partial(convert_file, input_path, output_path, **options))
+            await asyncio.wait_for(job, timeout)
+
+
+# Modules imported by each daemon worker when it starts, so the first job of
+# each kind does not pay for them.
+DAEMON_PREIMPORTS = ("pandas", "fitz", "PIL.Image", "PyPDF2", "openpyxl")
+
+
+def _warm_worker(modules):
+    import importlib
+
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+    for backend in _BACKENDS:
+        backend_available(backend)
+
+
+def _daemon_address(address):
+    # "unix:/path", a path containing "/" or ending in ".sock" is a Unix
+    # socket; "host:port", "tcp:host:port" or a bare port is TCP.
+    if address.startswith("unix:"):
+        return "unix", address[5:]
+    if "/" in address or address.endswith(".sock"):
+        return "unix", address
+    if address.startswith("tcp:"):
+        address = address[4:]
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+def daemon_request(address, **request):
+    import socket
+
+    kind, target = _daemon_address(address)
+    family = socket.AF_UNIX if kind == "unix" else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.connect(target)
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        with sock.makefile("rb") as reader:
+            return json.loads(reader.readline())
+
+
+def serve(address="127.0.0.1:8765", workers=None, max_queue=1000, preimports=DAEMON_PREIMPORTS, keep_finished=10000):
+    # Runs a conversion daemon until a "shutdown" request arrives. Clients
+    # send one JSON object per line and get one back:
+    #   {"op": "submit", "input", "output", "options", "priority", "timeout", "wait"}
+    #   {"op": "status" | "wait", "id", "timeout"}
+    #   {"op": "stats"} and {"op": "shutdown"}
+    # Jobs wait in a priority queue (higher first, FIFO within a priority) and
+    # only as many as there are workers are handed to the process pool, so
+    # priorities hold. Submissions beyond max_queue queued jobs are refused.
+    import heapq
+    import itertools
+    import socketserver
+    import uuid
+    from collections import OrderedDict
+    from concurrent.futures.process import BrokenProcessPool
+    from functools import partial
+
+    workers = workers or os.cpu_count() or 1
+    kind, target = _daemon_address(address)
+    cond = threading.Condition()
+    queue = []
+    jobs = {}
+    finished = OrderedDict()
+    sequence = itertools.count()
+    state = {"running": 0, "stopping": False, "completed": 0, "failed": 0}
+
+    def start_pool():
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker, initargs=(tuple(preimports),))
+        # Start every worker now rather than on the first jobs.
+        for future in [executor.submit(os.getpid) for _ in range(workers)]:
+            future.result()
+        return executor
+
+    def job_done(job, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            # BrokenProcessPool lands here for every job in flight when a
+            # worker dies.
+            result = {"input": job["input"], "output": job["output"], "status": "failed",
+                      "duration": 0.0, "error": str(e) or type(e).__name__, "output_size": None, "metrics": None}
+        if result["metrics"] is not None:
+            _emit_metrics(result["metrics"])
+        _merge_cache_delta(result.get("cache"))
+        with cond:
+            job.update(status=result["status"], finished=time.time(), result=result)
+            state["running"] -= 1
+            state["completed" if result["status"] == "ok" else "failed"] += 1
+            finished[job["id"]] = job
+            while len(finished) > keep_finished:
+                jobs.pop(finished.popitem(last=False)[0], None)
+            cond.notify_all()
+
+    def dispatch():
+        while True:
+            with cond:
+                while not state["stopping"] and (not queue or state["running"] >= workers):
+                    cond.wait()
+                if state["stopping"]:
+                    return
+                job = heapq.heappop(queue)[2]
+                job.update(status="running", started=time.time())
+                state["running"] += 1
+            while True:
+                try:
+                    future = pool["executor"].submit(
+                        _convert_job, job["input"], job["output"], job["timeout"], job["options"]
+                    )
+                    break
+                except BrokenProcessPool:
+                    # A worker was killed (OOM, SIGKILL); the jobs it took
+                    # down fail through job_done. Replace the pool and retry.
+                    logging.warning("Conversion worker died, restarting the process pool")
+                    pool["executor"].shutdown(wait=False)
+                    pool["executor"] = start_pool()
+            future.add_done_callback(partial(job_done, job))
+
+    def wait_for(job, timeout):
+        with cond:
+            cond.wait_for(lambda: job["status"] not in ("queued", "running"), timeout)
+            return dict(job)
+
+    def respond(request):
+        op = request.get("op")
+        if op == "submit":
+            if not request.get("input") or not request.get("output"):
+                raise ValueError("submit needs input and output")
+            job = {
+                "id": uuid.uuid4().hex,
+                "input": request["input"],
+                "output": request["output"],
+                "options": request.get("options") or {},
+                "priority": request.get("priority", 0),
+                "timeout": request.get("timeout"),
+                "status": "queued",
+                "submitted": time.time(),
+                "started": None,
+                "finished": None,
+                "result": None,
             }
-        )
+            with cond:
+                if len(queue) >= max_queue:
+                    return {"ok": False, "error": "queue full", "queued": len(queue)}
+                jobs[job["id"]] = job
+                heapq.heappush(queue, (-job["priority"], next(sequence), job))
+                cond.notify_all()
+            if request.get("wait"):
+                return {"ok": True, "job": wait_for(job, None)}
+            return {"ok": True, "job": dict(job)}
+        if op in ("status", "wait"):
+            with cond:
+                job = jobs.get(request.get("id"))
+            if job is None:
+                return {"ok": False, "error": f"unknown job {request.get('id')}"}
+            if op == "wait":
+                return {"ok": True, "job": wait_for(job, request.get("timeout"))}
+            with cond:
+                return {"ok": True, "job": dict(job)}
+        if op == "stats":
+            with cond:
+                return {"ok": True, "queued": len(queue), "running": state["running"],
+                        "completed": state["completed"], "failed": state["failed"], "workers": workers}
+        if op == "shutdown":
+            threading.Thread(target=server.shutdown, daemon=True).start()
+            return {"ok": True}
+        raise ValueError(f"Unknown op: {op}")
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    response = respond(json.loads(line))
+                except Exception as e:
+                    response = {"ok": False, "error": str(e)}
+                self.wfile.write(json.dumps(response, default=str).encode() + b"\n")
+                self.wfile.flush()
+
+    class Server(socketserver.ThreadingUnixStreamServer if kind == "unix" else socketserver.ThreadingTCPServer):
+        allow_reuse_address = True
+        daemon_threads = True
+
+    if kind == "unix" and os.path.exists(target):
+        os.remove(target)
+    server = Server(target, Handler)
+
+    pool = {"executor": start_pool()}
+    dispatcher = threading.Thread(target=dispatch, daemon=True)
+    dispatcher.start()
+    logging.info(f"Serving conversions on {address} with {workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        with cond:
+            state["stopping"] = True
+            for _, _, job in queue:
+                job["status"] = "cancelled"
+            queue.clear()
+            cond.notify_all()
+        server.server_close()
+        pool["executor"].shutdown(wait=True)
+        if kind == "unix" and os.path.exists(target):
+            os.remove(target)
+        logging.info("Conversion daemon stopped")
 
-    return supported.get(input_ext.lower().lstrip("."), [])
+
+def get_supported_conversions(input_ext):
+    input_ext = "." + input_ext.lower().lstrip(".")
+    supported = []
+    for (source, target), entries in _CONVERTERS.items():
+        if source not in (input_ext, "*") or target == input_ext:
+            continue
+        if not any(backend_available(entry["backend"]) for entry in entries):
+            continue
+        target = "." if target == "*" else target
+        if target not in supported:
+            supported.append(target)
+    return supported
 
 def get_supported_input_formats() -> Dict[str, List[str]]:
     return {
-        "Document": [".docx", ".pdf", ".txt", ".md", ".html", ".epub"],
+        "Document": [".docx", ".doc", ".odt", ".rtf", ".pptx", ".ppt", ".odp", ".pdf", ".txt", ".md", ".html", ".epub"],
         "Image": [".png", ".jpg", ".jpeg", ".tiff", ".heic", ".webp", ".gif", ".bmp"],
         "Spreadsheet": [".xlsx", ".csv"],
-        "Data": [".json", ".yaml", ".xml"],
+        "Data": [".json", ".ndjson", ".jsonl", ".yaml", ".xml", ".parquet", ".feather", ".arrow"],
         "Archive": [".zip", ".rar", ".7z"],
         "Video": [".mp4", ".mov", ".avi", ".mkv", ".webm", ".flv", ".wmv"],
         "Audio": [".mp3", ".wav", ".ogg", ".flac", ".aac", ".m4a", ".wma"]
@@ -569,7 +3405,7 @@ def show_help():
         if not format_found:
             print(f"{file_type} is not a supported input format.")
 
-def main():
+def interactive():
     while True:
         input_files, output_file = prompt_for_files()
         
@@ -587,6 +3423,216 @@ def main():
         except Exception as e:
             print(f"Conversion failed: {str(e)}")
 
+
+def _parse_option(text):
+    # key=value, with the value read as JSON when it parses (numbers, true,
+    # lists) and as a plain string otherwise.
+    import argparse
+
+    key, sep, value = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"Options take the form key=value: {text}")
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def _read_job_file(path):
+    # CSV with input and output columns (and an optional JSON "options"
+    # column), or JSON lines with the same keys; "-" reads JSON lines from
+    # stdin. Yields (input, output, options), or a failed result for a line
+    # that can't be read so the rest of the file still runs.
+    def parse(number, load):
+        job = None
+        try:
+            job = load()
+            if not isinstance(job, dict):
+                raise ValueError("expected a JSON object")
+            options = job.get("options") or {}
+            if isinstance(options, str):
+                options = json.loads(options)
+            return job["input"], job["output"], options
+        except KeyError as e:
+            error = f"missing {e}"
+        except ValueError as e:
+            error = str(e)
+        job = job if isinstance(job, dict) else {}
+        return {"input": job.get("input") or f"{path}:{number}", "output": job.get("output"), "status": "failed",
+                "duration": 0.0, "error": f"{path}:{number}: {error}", "output_size": None, "metrics": None}
+
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as file:
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield parse(reader.line_num, lambda: row)
+        return
+    file = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for number, line in enumerate(file, 1):
+            if line.strip():
+                yield parse(number, lambda: json.loads(line))
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+def _cli_jobs(args):
+    options = dict(args.option)
+    if args.job_file:
+        for job in _read_job_file(args.job_file):
+            if isinstance(job, dict):
+                yield job
+            else:
+                input_path, output_path, job_options = job
+                yield input_path, output_path, args.timeout, {**options, **job_options}
+    elif args.to:
+        to = args.to if args.to.startswith(".") else "." + args.to
+        for input_path in args.inputs:
+            output_dir = args.output or os.path.dirname(input_path)
+            stem = os.path.splitext(os.path.basename(input_path))[0]
+            yield input_path, os.path.join(output_dir, stem + to), args.timeout, options
+    elif args.output:
+        inputs = args.inputs if len(args.inputs) > 1 else args.inputs[0]
+        yield inputs, args.output, args.timeout, options
+    else:
+        raise ValueError("Give an output with -o, a target extension with --to, or a --job-file")
+
+
+def _print_result(result, fmt):
+    if fmt == "jsonl":
+        print(json.dumps(result, default=str), flush=True)
+    elif fmt == "text":
+        line = f"{result['status']:<8} {result['input']} -> {result['output']} ({result['duration']:.2f}s)"
+        if result["error"]:
+            line += f": {result['error']}"
+        print(line, flush=True)
+
+
+def _print_results(results, fmt):
+    if fmt == "json":
+        print(json.dumps({"results": results, "summary": summarize_metrics(results)}, indent=2, default=str))
+    elif fmt == "text":
+        failed = sum(result["status"] in ("failed", "timeout") for result in results)
+        print(f"{len(results)} conversions, {failed} failed")
+
+
+def _cli_convert(args):
+    import itertools
+
+    results = []
+    failed = False
+
+    def report(result):
+        nonlocal failed
+        results.append(result)
+        _print_result(result, args.format)
+        if result["status"] != "ok":
+            failed = True
+
+    def jobs():
+        # Job-file lines that could not be read come through as failed
+        # results; they are reported here and never reach the pool.
+        for job in _cli_jobs(args):
+            if not isinstance(job, dict):
+                yield job
+                continue
+            report(job)
+            if not args.continue_on_error:
+                return
+
+    # _run_jobs pulls jobs lazily, so a large job file is never held whole.
+    # A single conversion runs in-process unless --jobs asks for a pool.
+    pending = jobs()
+    head = list(itertools.islice(pending, 2))
+    workers = args.jobs if args.jobs is not None or len(head) > 1 else 1
+    runs = _run_jobs(_convert_job, itertools.chain(head, pending), workers, args.max_in_flight)
+    try:
+        for _, result in runs:
+            report(result)
+            if failed and not args.continue_on_error:
+                break
+    finally:
+        # Lets jobs already in the pool finish before returning.
+        runs.close()
+    _print_results(results, args.format)
+    return 1 if failed else 0
+
+
+def _cli_batch(args):
+    mapping = dict(item.split("=", 1) for item in args.map)
+    results = batch_convert(
+        args.input_dir, args.output_dir, mapping, workers=args.jobs, max_in_flight=args.max_in_flight,
+        timeout=args.timeout, manifest=args.state, prune=args.prune, recursive=args.recursive,
+        include=args.include, exclude=args.exclude, **dict(args.option),
+    )
+    for result in results:
+        _print_result(result, args.format)
+    _print_results(results, args.format)
+    return 1 if any(result["status"] in ("failed", "timeout") for result in results) else 0
+
+
+def _cli_serve(args):
+    serve(args.address, workers=args.jobs, max_queue=args.max_queue)
+    return 0
+
+
+def main(argv=None):
+    import argparse
+
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        interactive()
+        return 0
+
+    parser = argparse.ArgumentParser(prog="fileconvert", description="Convert files between formats.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-j", "--jobs", type=int, help="worker processes (default: one per CPU)")
+    common.add_argument("--max-in-flight", type=int, help="jobs handed to the pool at once")
+    common.add_argument("--timeout", type=float, help="seconds allowed per conversion")
+    common.add_argument("--option", action="append", type=_parse_option, default=[], metavar="KEY=VALUE",
+                        help="converter option, repeatable; values are parsed as JSON when possible")
+    common.add_argument("--format", choices=["text", "json", "jsonl"], default="text", help="result output")
+    common.add_argument("-q", "--quiet", action="store_true", help="only log warnings and errors")
+
+    convert = subparsers.add_parser("convert", parents=[common], help="convert files or a job file")
+    convert.add_argument("inputs", nargs="*", help="input files; several inputs with -o x.pdf make one PDF")
+    convert.add_argument("-o", "--output", help="output file, or output directory with --to")
+    convert.add_argument("--to", help="convert each input to this extension")
+    convert.add_argument("--job-file", help="CSV or JSON lines of input/output[/options] jobs, - for stdin")
+    convert.add_argument("--continue-on-error", action="store_true", help="keep going after a failed job")
+    convert.set_defaults(func=_cli_convert)
+
+    batch = subparsers.add_parser("batch", parents=[common], help="convert a directory tree")
+    batch.add_argument("input_dir")
+    batch.add_argument("output_dir")
+    batch.add_argument("--map", action="append", required=True, metavar="IN=OUT",
+                       help="extension mapping such as .csv=.json, repeatable")
+    batch.add_argument("-r", "--recursive", action="store_true")
+    batch.add_argument("--include", action="append", help="glob of relative paths to convert")
+    batch.add_argument("--exclude", action="append", help="glob of relative paths to skip")
+    batch.add_argument("--state", help="manifest file for incremental runs")
+    batch.add_argument("--prune", action="store_true", help="delete outputs whose inputs are gone")
+    batch.set_defaults(func=_cli_batch)
+
+    daemon = subparsers.add_parser("serve", parents=[common], help="run the conversion daemon")
+    daemon.add_argument("--address", default="127.0.0.1:8765", help="host:port or a Unix socket path")
+    daemon.add_argument("--max-queue", type=int, default=1000)
+    daemon.set_defaults(func=_cli_serve)
+
+    args = parser.parse_args(argv)
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+    if args.command == "convert" and not args.job_file and not args.inputs:
+        parser.error("convert needs input files or --job-file")
+    try:
+        return args.func(args)
+    except (ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+
 if __name__ == "__main__":
-    get_project_requirements()
-    main()
\ No newline at end of file
+    sys.exit(main())
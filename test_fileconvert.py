@@ -1,7 +1,10 @@
 import unittest
+import unittest.mock
 import os
 import tempfile
 import shutil
+import subprocess
+import sys
 from reportlab.pdfgen import canvas
 
 from fileconvert import (
@@ -19,9 +22,41 @@ from fileconvert import (
     markdown_to_html,
     html_to_markdown,
     compress_zip,
+    compress_rar,
     extract_zip,
+    list_archive,
+    open_archive_member,
     images_to_pdf,
     html_to_pdf,
+    batch_convert,
+    transcode,
+    extract_audio_from_video,
+    probe_media,
+    pandoc_batch,
+    office_to_pdf,
+    start_office_pool,
+    stop_office_pool,
+    convert_file_async,
+    convert_images,
+    convert_pdf,
+    enable_cache,
+    disable_cache,
+    cache_stats,
+    convert_data_format,
+    convert_xml,
+    csv_to_ndjson,
+    convert_file,
+    add_metrics_hook,
+    remove_metrics_hook,
+    summarize_metrics,
+    serve,
+    daemon_request,
+    main,
+    register_converter,
+    find_converter,
+    backend_available,
+    get_supported_conversions,
+    _CONVERTERS,
 )
 
 class TestFileConvert(unittest.TestCase):
@@ -77,6 +112,162 @@ class TestFileConvert(unittest.TestCase):
         json_to_csv(input_file, output_file)
         self.assertTrue(os.path.exists(output_file))
 
+        # Records need not share keys.
+        with open(input_file, 'w') as f:
+            json.dump([{"A": 1}, {"A": 2, "B": 3}], f)
+        json_to_csv(input_file, output_file)
+        with open(output_file) as f:
+            self.assertEqual(f.read().splitlines(), ["A,B", "1,", "2,3"])
+
+    def test_csv_ndjson_round_trip(self):
+        input_file = os.path.join(self.temp_dir, "test.csv")
+        ndjson_file = os.path.join(self.temp_dir, "test.ndjson")
+        json_file = os.path.join(self.temp_dir, "test.json")
+        output_file = os.path.join(self.temp_dir, "back.csv")
+        with open(input_file, 'w') as f:
+            f.write("A,B\n1,4\n2,5\n3,6\n")
+
+        csv_to_ndjson(input_file, ndjson_file)
+        with open(ndjson_file) as f:
+            self.assertEqual(len(f.readlines()), 3)
+        json_to_csv(ndjson_file, output_file)
+        with open(output_file) as f:
+            self.assertEqual(f.read().splitlines(), ["A,B", "1,4", "2,5", "3,6"])
+
+        csv_to_json(input_file, json_file)
+        import json
+        with open(json_file) as f:
+            self.assertEqual(json.load(f)[2], {"A": "3", "B": "6"})
+
+    def test_convert_data_format_chunked(self):
+        input_file = os.path.join(self.temp_dir, "test.csv")
+        with open(input_file, 'w') as f:
+            f.write("A,B\n" + "".join(f"{i},{i * 2}\n" for i in range(10)))
+
+        for ext in (".xlsx", ".yaml", ".json", ".csv"):
+            output_file = os.path.join(self.temp_dir, "out" + ext)
+            stats = convert_data_format(input_file, output_file, chunksize=3)
+            self.assertEqual(stats["rows"], 10)
+            self.assertEqual(stats["chunks"], 4)
+            self.assertGreater(stats["peak_rss"], 0)
+
+            round_trip = os.path.join(self.temp_dir, "round_trip.csv")
+            convert_data_format(output_file, round_trip, chunksize=4)
+            with open(round_trip) as f:
+                self.assertEqual(len(f.read().splitlines()), 11)
+
+    def test_convert_columnar_formats(self):
+        if not backend_available("pyarrow"):
+            self.skipTest("pyarrow is not installed. Skipping test.")
+        import pyarrow.parquet as pq
+
+        input_file = os.path.join(self.temp_dir, "test.csv")
+        with open(input_file, 'w') as f:
+            f.write("A,B\n" + "".join(f"{i},x{i}\n" for i in range(10)))
+
+        parquet_file = os.path.join(self.temp_dir, "test.parquet")
+        stats = convert_data_format(input_file, parquet_file, compression="zstd", row_group_size=4)
+        self.assertEqual(stats["rows"], 10)
+        metadata = pq.ParquetFile(parquet_file).metadata
+        self.assertEqual(metadata.num_row_groups, 3)
+        self.assertEqual(metadata.row_group(0).column(0).compression, "ZSTD")
+
+        # Row groups are not capped at the read batch size, on the Arrow path
+        # (CSV) or the pandas one (JSON).
+        json_file = os.path.join(self.temp_dir, "test.json")
+        convert_data_format(input_file, json_file)
+        for source in (input_file, json_file):
+            convert_data_format(source, parquet_file, chunksize=3, row_group_size=8)
+            metadata = pq.ParquetFile(parquet_file).metadata
+            sizes = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+            self.assertEqual(sizes, [8, 2])
+        convert_data_format(input_file, parquet_file, chunksize=3)
+        self.assertEqual(pq.ParquetFile(parquet_file).metadata.num_row_groups, 1)
+
+        feather_file = os.path.join(self.temp_dir, "test.feather")
+        convert_file(parquet_file, feather_file)
+        ndjson_file = os.path.join(self.temp_dir, "test.ndjson")
+        convert_file(feather_file, ndjson_file)
+        import json
+        with open(ndjson_file) as f:
+            self.assertEqual(json.loads(f.readlines()[3]), {"A": 3, "B": "x3"})
+
+        # pyarrow types CSV columns from the first block; a column that stops
+        # being numeric after it is read as text instead of failing.
+        mixed_file = os.path.join(self.temp_dir, "mixed.csv")
+        with open(mixed_file, 'w') as f:
+            f.write("A,B\n" + "".join(f"{i},{i}\n" for i in range(600000)) + "0,abc\n")
+        stats = convert_data_format(mixed_file, parquet_file, chunksize=100000)
+        self.assertEqual(stats["rows"], 600001)
+        self.assertGreaterEqual(stats["chunks"], 6)
+        schema = pq.read_schema(parquet_file)
+        self.assertEqual((str(schema.field("A").type), str(schema.field("B").type)), ("int64", "string"))
+
+        # An all-null column in the first chunk must not pin it to null.
+        json_file = os.path.join(self.temp_dir, "nulls.json")
+        with open(json_file, 'w') as f:
+            json.dump([{"A": i, "B": None if i < 3 else f"x{i}"} for i in range(6)], f)
+        convert_data_format(json_file, parquet_file, chunksize=3)
+        self.assertEqual(pq.read_table(parquet_file).column("B").to_pylist()[-1], "x5")
+
+        # Formats pyarrow cannot write go through pandas, chunked or not.
+        for chunksize in (None, 3):
+            xlsx_file = os.path.join(self.temp_dir, "test.xlsx")
+            convert_data_format(feather_file, xlsx_file, chunksize=chunksize)
+            arrow_file = os.path.join(self.temp_dir, "test.arrow")
+            convert_data_format(xlsx_file, arrow_file, chunksize=chunksize)
+            round_trip = os.path.join(self.temp_dir, "round_trip.csv")
+            convert_file(arrow_file, round_trip)
+            with open(round_trip) as f:
+                self.assertEqual(f.read().splitlines()[:2], ['"A","B"', '0,"x0"'])
+
+    def test_convert_xml_streaming(self):
+        input_file = os.path.join(self.temp_dir, "feed.xml")
+        with open(input_file, 'w') as f:
+            f.write(
+                '<feed><meta>x</meta><items>'
+                '<item id="1"><name>a</name><tag>p</tag><tag>q</tag></item>'
+                '<item id="2"><name>b</name><price cur="EUR">3</price></item>'
+                '</items></feed>'
+            )
+        import json
+
+        json_file = os.path.join(self.temp_dir, "feed.json")
+        self.assertEqual(convert_xml(input_file, json_file, record_tag="item"), {"records": 2})
+        with open(json_file) as f:
+            self.assertEqual(json.load(f), [
+                {"@id": "1", "name": "a", "tag": ["p", "q"]},
+                {"@id": "2", "name": "b", "price": {"@cur": "EUR", "#text": "3"}},
+            ])
+
+        ndjson_file = os.path.join(self.temp_dir, "feed.ndjson")
+        convert_xml(input_file, ndjson_file)
+        with open(ndjson_file) as f:
+            self.assertEqual([json.loads(line) for line in f], [
+                {"meta": "x"},
+                {"item": [
+                    {"@id": "1", "name": "a", "tag": ["p", "q"]},
+                    {"@id": "2", "name": "b", "price": {"@cur": "EUR", "#text": "3"}},
+                ]},
+            ])
+
+        csv_file = os.path.join(self.temp_dir, "feed.csv")
+        convert_xml(input_file, csv_file, record_tag="item", sample=1)
+        with open(csv_file) as f:
+            self.assertEqual(f.read().splitlines(), ['@id,name,tag', '1,a,"[""p"", ""q""]"', '2,b,'])
+
+        convert_file(input_file, os.path.join(self.temp_dir, "converted.json"))
+        with open(os.path.join(self.temp_dir, "converted.json")) as f:
+            self.assertEqual(json.load(f)[0], {"meta": "x"})
+
+        # The generic entry points pass the record options through.
+        convert_data_format(input_file, json_file, record_tag="item")
+        with open(json_file) as f:
+            self.assertEqual(json.load(f)[1]["name"], "b")
+        convert_file(input_file, csv_file, record_tag="item", fieldnames=["name"])
+        with open(csv_file) as f:
+            self.assertEqual(f.read().splitlines(), ["name", "a", "b"])
+
     def test_json_to_yaml(self):
         input_file = os.path.join(self.temp_dir, "test.json")
         output_file = os.path.join(self.temp_dir, "test.yaml")
@@ -118,6 +309,24 @@ class TestFileConvert(unittest.TestCase):
         pdf_to_text(input_file, output_file)
         self.assertTrue(os.path.exists(output_file))
 
+    def test_pdf_to_text_parallel(self):
+        input_file = os.path.join(self.temp_dir, "test.pdf")
+        c = canvas.Canvas(input_file)
+        for i in range(5):
+            c.drawString(100, 100, f"Page {i}")
+            c.showPage()
+        c.save()
+
+        for backend in ("pypdf2", "pymupdf"):
+            serial = os.path.join(self.temp_dir, f"{backend}.txt")
+            parallel = os.path.join(self.temp_dir, f"{backend}-parallel.txt")
+            pdf_to_text(input_file, serial, backend=backend)
+            pdf_to_text(input_file, parallel, backend=backend, workers=2)
+            with open(serial) as f, open(parallel) as g:
+                text = f.read()
+                self.assertEqual(text, g.read())
+            self.assertLess(text.index("Page 1"), text.index("Page 4"))
+
     def test_text_to_word(self):
         input_file = os.path.join(self.temp_dir, "test.txt")
         output_file = os.path.join(self.temp_dir, "test.docx")
@@ -137,6 +346,29 @@ class TestFileConvert(unittest.TestCase):
         convert_image(input_file, output_file)
         self.assertTrue(os.path.exists(output_file))
 
+    def test_convert_images(self):
+        from PIL import Image
+        input_files = []
+        for i in range(3):
+            path = os.path.join(self.temp_dir, f"photo{i}.jpg")
+            Image.new('RGB', (800, 600), color='blue').save(path)
+            input_files.append(path)
+        output_dir = os.path.join(self.temp_dir, "out")
+        os.mkdir(output_dir)
+        specs = [
+            {"format": ".webp", "suffix": "_thumb", "max_size": (128, 128), "quality": 70},
+            {"format": ".jpg", "max_size": (400, 400), "progressive": True, "optimize": True},
+        ]
+
+        report = convert_images(input_files, output_dir, specs, workers=2)
+        self.assertEqual(report["images"], 3)
+        self.assertEqual(report["outputs"], 6)
+        self.assertGreater(report["images_per_second"], 0)
+        with Image.open(os.path.join(output_dir, "photo0_thumb.webp")) as img:
+            self.assertEqual(img.size, (128, 96))
+        with Image.open(os.path.join(output_dir, "photo2.jpg")) as img:
+            self.assertEqual(img.size, (400, 300))
+
     def test_convert_pdf_to_image(self):
         input_file = os.path.join(self.temp_dir, "test.pdf")
         output_file = os.path.join(self.temp_dir, "test.png")
@@ -147,6 +379,66 @@ class TestFileConvert(unittest.TestCase):
         convert_pdf_to_image(input_file, output_file)
         self.assertTrue(os.path.exists(output_file))
 
+    def test_convert_pdf_to_image_page_order(self):
+        if not shutil.which('pdftoppm'):
+            self.skipTest("pdftoppm is not installed. Skipping test.")
+        input_file = os.path.join(self.temp_dir, "test.pdf")
+        c = canvas.Canvas(input_file)
+        # Page widths tell the rendered pages apart.
+        for i in range(6):
+            c.setPageSize((100 + 20 * i, 100))
+            c.drawString(10, 10, f"Page {i}")
+            c.showPage()
+        c.save()
+
+        outputs = convert_pdf_to_image(input_file, os.path.join(self.temp_dir, "page.png"), pages="all", dpi=72, workers=3)
+        from PIL import Image
+        widths = []
+        for path in outputs:
+            with Image.open(path) as img:
+                widths.append(img.width)
+        self.assertEqual(widths, [100 + 20 * i for i in range(6)])
+
+    def test_convert_pdf_to_image_renders_only_wanted_pages(self):
+        from PIL import Image
+        calls = []
+
+        def convert_from_path(path, first_page, last_page, output_folder, **kwargs):
+            calls.append((first_page, last_page))
+            paths = []
+            for number in range(first_page, last_page + 1):
+                paths.append(os.path.join(output_folder, f"{len(calls)}-{number}.png"))
+                Image.new("RGB", (number, 10)).save(paths[-1])
+            return paths
+
+        with unittest.mock.patch("pdf2image.pdfinfo_from_path", return_value={"Pages": 600}), \
+                unittest.mock.patch("pdf2image.convert_from_path", side_effect=convert_from_path):
+            outputs = convert_pdf_to_image("test.pdf", os.path.join(self.temp_dir, "page.png"), pages="1,3-4,500")
+        self.assertEqual(calls, [(1, 1), (3, 4), (500, 500)])
+        widths = []
+        for path in outputs:
+            with Image.open(path) as img:
+                widths.append(img.width)
+        self.assertEqual(widths, [1, 3, 4, 500])
+
+    def test_convert_pdf_pages(self):
+        input_file = os.path.join(self.temp_dir, "test.pdf")
+        c = canvas.Canvas(input_file)
+        for i in range(4):
+            c.drawString(100, 100, f"Page {i}")
+            c.showPage()
+        c.save()
+
+        outputs = convert_pdf(input_file, os.path.join(self.temp_dir, "page.png"), pages="all", dpi=50, workers=2)
+        self.assertEqual([os.path.basename(p) for p in outputs], ["page-1.png", "page-2.png", "page-3.png", "page-4.png"])
+        self.assertTrue(all(os.path.exists(p) for p in outputs))
+
+        tiff_file = os.path.join(self.temp_dir, "pages.tiff")
+        convert_pdf(input_file, tiff_file, pages="2-3", dpi=50)
+        from PIL import Image
+        with Image.open(tiff_file) as img:
+            self.assertEqual(img.n_frames, 2)
+
     def test_markdown_to_html(self):
         input_file = os.path.join(self.temp_dir, "test.md")
         output_file = os.path.join(self.temp_dir, "test.html")
@@ -167,6 +459,52 @@ class TestFileConvert(unittest.TestCase):
         html_to_markdown(input_file, output_file)
         self.assertTrue(os.path.exists(output_file))
 
+    def test_pandoc_batch(self):
+        if not shutil.which('pandoc'):
+            self.skipTest("Pandoc is not installed. Skipping test.")
+        jobs = []
+        for i in range(3):
+            input_file = os.path.join(self.temp_dir, f"test{i}.html")
+            with open(input_file, 'w') as f:
+                f.write(f"<h1>Test {i}</h1><p>This is a test.</p>")
+            jobs.append((input_file, os.path.join(self.temp_dir, f"test{i}.md")))
+
+        pandoc_batch(jobs, "html", "markdown")
+        with open(jobs[2][1]) as f:
+            self.assertIn("Test 2", f.read())
+
+    def test_office_to_pdf(self):
+        if not shutil.which('soffice'):
+            self.skipTest("LibreOffice is not installed. Skipping test.")
+        self.addCleanup(stop_office_pool)
+        from docx import Document
+        for i in range(2):
+            input_file = os.path.join(self.temp_dir, f"test{i}.docx")
+            doc = Document()
+            doc.add_paragraph(f"Test document {i}")
+            doc.save(input_file)
+            output_file = os.path.join(self.temp_dir, f"test{i}.pdf")
+            office_to_pdf(input_file, output_file)
+            self.assertTrue(os.path.exists(output_file))
+
+    def test_office_pool_stops_every_instance(self):
+        import fileconvert
+        # A stand-in for soffice that just stays up like a headless instance.
+        soffice = os.path.join(self.temp_dir, "soffice")
+        with open(soffice, 'w') as f:
+            f.write("#!/bin/sh\nexec sleep 60\n")
+        os.chmod(soffice, 0o755)
+        self.addCleanup(stop_office_pool)
+
+        start_office_pool(size=2, soffice=soffice)
+        instances = list(fileconvert._office_instances.values())
+        checked_out = fileconvert._office_workers.get()
+        stop_office_pool()
+        self.assertIn(checked_out, instances)
+        for worker in instances:
+            self.assertIsNotNone(worker["process"].poll())
+            self.assertFalse(os.path.exists(worker["profile"]))
+
     def test_compress_zip(self):
         input_file = os.path.join(self.temp_dir, "test.txt")
         output_file = os.path.join(self.temp_dir, "test.zip")
@@ -176,6 +514,63 @@ class TestFileConvert(unittest.TestCase):
         compress_zip(input_file, output_file)
         self.assertTrue(os.path.exists(output_file))
 
+    def test_compress_zip_directory(self):
+        import zipfile
+        source = os.path.join(self.temp_dir, "tree")
+        os.makedirs(os.path.join(source, "sub"))
+        for i in range(20):
+            with open(os.path.join(source, "sub" if i % 2 else "", f"file{i}.txt"), 'w') as f:
+                f.write(f"line {i}\n" * 100)
+        with open(os.path.join(source, "photo.jpg"), 'wb') as f:
+            f.write(os.urandom(1000))
+
+        output_file = os.path.join(self.temp_dir, "tree.zip")
+        stats = compress_zip(source, output_file)
+        self.assertEqual(stats["files"], 21)
+        self.assertGreater(stats["bytes_per_second"], 0)
+        with zipfile.ZipFile(output_file) as zipf:
+            self.assertIsNone(zipf.testzip())
+            self.assertIn("tree/sub/file1.txt", zipf.namelist())
+            self.assertEqual(zipf.getinfo("tree/photo.jpg").compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(zipf.getinfo("tree/file0.txt").compress_type, zipfile.ZIP_DEFLATED)
+
+        output_file = os.path.join(self.temp_dir, "glob.zip")
+        stats = compress_zip(os.path.join(source, "**", "*.txt"), output_file)
+        self.assertEqual(stats["files"], 20)
+        with zipfile.ZipFile(output_file) as zipf:
+            self.assertIn("sub/file3.txt", zipf.namelist())
+
+    def test_compress_rar_keeps_directories(self):
+        import zipfile
+        # A stand-in for rar that stores the listed names as given, relative
+        # to its working directory, in a zip.
+        bin_dir = os.path.join(self.temp_dir, "bin")
+        os.mkdir(bin_dir)
+        with open(os.path.join(bin_dir, "rar"), 'w') as f:
+            f.write(
+                f"#!{sys.executable}\n"
+                "import sys, zipfile\n"
+                "archive = [a for a in sys.argv[2:] if a[0] not in '-@'][0]\n"
+                "listing = [a for a in sys.argv if a.startswith('@')][0][1:]\n"
+                "with open(listing) as f, zipfile.ZipFile(archive, 'a') as zipf:\n"
+                "    for name in f.read().splitlines():\n"
+                "        zipf.write(name)\n"
+            )
+        os.chmod(os.path.join(bin_dir, "rar"), 0o755)
+        source = os.path.join(self.temp_dir, "tree")
+        for directory in ("a", "b"):
+            os.makedirs(os.path.join(source, directory))
+            with open(os.path.join(source, directory, "same.txt"), 'w') as f:
+                f.write(directory)
+
+        output_file = os.path.join(self.temp_dir, "tree.rar")
+        with unittest.mock.patch.dict(os.environ, {"PATH": bin_dir + os.pathsep + os.environ["PATH"]}):
+            stats = compress_rar(source, output_file)
+        self.assertEqual(stats["files"], 2)
+        with zipfile.ZipFile(output_file) as zipf:
+            self.assertEqual(sorted(zipf.namelist()), ["tree/a/same.txt", "tree/b/same.txt"])
+            self.assertEqual(zipf.read("tree/b/same.txt"), b"b")
+
     def test_extract_zip(self):
         input_file = os.path.join(self.temp_dir, "test.zip")
         output_dir = os.path.join(self.temp_dir, "extracted")
@@ -187,6 +582,59 @@ class TestFileConvert(unittest.TestCase):
         extract_zip(input_file, output_dir)
         self.assertTrue(os.path.exists(os.path.join(output_dir, "test.txt")))
 
+    def test_extract_zip_selective(self):
+        input_file = os.path.join(self.temp_dir, "test.zip")
+        output_dir = os.path.join(self.temp_dir, "extracted")
+        import zipfile
+        with zipfile.ZipFile(input_file, 'w') as zipf:
+            for i in range(10):
+                zipf.writestr(f"data/part{i}.csv", f"id\n{i}\n")
+            zipf.writestr("README.txt", "Test file for extraction")
+
+        members = list_archive(input_file)
+        self.assertEqual(len(members), 11)
+        self.assertEqual(members[-1], {"name": "README.txt", "size": 24, "compressed_size": 24, "is_dir": False})
+
+        with open_archive_member(input_file, "README.txt") as f:
+            self.assertEqual(f.read(), b"Test file for extraction")
+
+        names = extract_zip(input_file, output_dir, members="data/*.csv", workers=4)
+        self.assertEqual(len(names), 10)
+        self.assertEqual(sorted(os.listdir(os.path.join(output_dir, "data"))), sorted(os.path.basename(n) for n in names))
+        self.assertFalse(os.path.exists(os.path.join(output_dir, "README.txt")))
+
+    def test_convert_archive_members(self):
+        input_file = os.path.join(self.temp_dir, "test.zip")
+        import io
+        import zipfile
+        from PIL import Image
+        with zipfile.ZipFile(input_file, 'w') as zipf:
+            for i in range(3):
+                buffer = io.BytesIO()
+                Image.new('RGB', (100, 100), color='red').save(buffer, 'PNG')
+                zipf.writestr(f"scans/page{i}.png", buffer.getvalue())
+            zipf.writestr("data/a.csv", "A,B\n1,4\n2,5\n")
+            zipf.writestr("data/b.csv", "A,B\n3,6\n")
+
+        output_file = os.path.join(self.temp_dir, "scans.pdf")
+        convert_file(input_file + "!/scans/*.png", output_file)
+        with open(output_file, 'rb') as f:
+            self.assertEqual(f.read().count(b"/Type /Page "), 3)
+
+        output_file = os.path.join(self.temp_dir, "a.json")
+        convert_file(input_file + "!/data/a.csv", output_file)
+        import json
+        with open(output_file) as f:
+            self.assertEqual(json.load(f), [{"A": 1, "B": 4}, {"A": 2, "B": 5}])
+
+        output_file = os.path.join(self.temp_dir, "converted.zip")
+        convert_file(input_file + "!/data/*.csv", output_file + "!/json/*.json")
+        with zipfile.ZipFile(output_file) as zipf:
+            self.assertEqual(zipf.namelist(), ["json/data/a.json", "json/data/b.json"])
+
+        with self.assertRaises(ValueError):
+            convert_file(input_file + "!/data/*.csv", os.path.join(self.temp_dir, "all.json"))
+
     def test_images_to_pdf(self):
         input_files = [
             os.path.join(self.temp_dir, "test1.png"),
@@ -201,6 +649,21 @@ class TestFileConvert(unittest.TestCase):
         images_to_pdf(input_files, output_file)
         self.assertTrue(os.path.exists(output_file))
 
+    def test_images_to_pdf_incremental(self):
+        from PIL import Image
+        input_files = []
+        for i, (mode, ext) in enumerate([("RGB", ".jpg"), ("RGBA", ".png"), ("P", ".png")]):
+            path = os.path.join(self.temp_dir, f"test{i}{ext}")
+            Image.new(mode, (100 + i, 50)).save(path)
+            input_files.append(path)
+        output_file = os.path.join(self.temp_dir, "test.pdf")
+
+        images_to_pdf(input_files, output_file, incremental=True)
+        import fitz
+        with fitz.open(output_file) as doc:
+            self.assertEqual(doc.page_count, 3)
+            self.assertAlmostEqual(doc[1].rect.width, 101 * 72 / 100, places=2)
+
     def test_html_to_pdf(self):
         if not shutil.which('wkhtmltopdf'):
             self.skipTest("wkhtmltopdf is not installed. Skipping test.")
@@ -212,5 +675,442 @@ class TestFileConvert(unittest.TestCase):
         html_to_pdf(input_file, output_file)
         self.assertTrue(os.path.exists(output_file))
 
+    def test_batch_convert(self):
+        input_dir = os.path.join(self.temp_dir, "input")
+        output_dir = os.path.join(self.temp_dir, "output")
+        os.mkdir(input_dir)
+        os.mkdir(output_dir)
+        for i in range(4):
+            with open(os.path.join(input_dir, f"test{i}.csv"), 'w') as f:
+                f.write("A,B\n1,4\n2,5\n3,6")
+        with open(os.path.join(input_dir, "broken.csv"), 'w') as f:
+            f.write("")
+
+        results = batch_convert(input_dir, output_dir, ".csv", ".json", workers=2, max_in_flight=2)
+        self.assertEqual(len(results), 5)
+        statuses = {os.path.basename(r["input"]): r["status"] for r in results}
+        self.assertEqual(statuses.pop("broken.csv"), "failed")
+        self.assertEqual(set(statuses.values()), {"ok"})
+        for result in results:
+            if result["status"] == "ok":
+                self.assertTrue(os.path.exists(result["output"]))
+                self.assertGreater(result["output_size"], 0)
+
+    def test_batch_convert_recursive(self):
+        input_dir = os.path.join(self.temp_dir, "input")
+        output_dir = os.path.join(self.temp_dir, "output")
+        for directory in ("a/b", "skip"):
+            os.makedirs(os.path.join(input_dir, directory))
+        files = {
+            "top.CSV": "A\n1\n",
+            "a/big.csv": "A\n" + "1\n" * 1000,
+            "a/b/deep.json": '[{"A": 1}]',
+            "a/b/draft_notes.csv": "A\n1\n",
+            "skip/ignored.csv": "A\n1\n",
+            "a/readme.txt": "not data",
+        }
+        for name, content in files.items():
+            with open(os.path.join(input_dir, name), 'w') as f:
+                f.write(content)
+
+        import fileconvert
+        with unittest.mock.patch("fileconvert._run_jobs", wraps=fileconvert._run_jobs) as run_jobs:
+            results = batch_convert(
+                input_dir, output_dir, {".csv": ".json", ".json": ".csv"}, workers=1,
+                recursive=True, exclude=["skip", "*/draft_*"],
+            )
+        submitted = [os.path.basename(job[0]) for job in run_jobs.call_args[0][1]]
+        self.assertEqual(submitted[0], "big.csv")
+
+        outputs = sorted(os.path.relpath(r["output"], output_dir) for r in results)
+        self.assertEqual(outputs, [os.path.join("a", "b", "deep.csv"), os.path.join("a", "big.json"), "top.json"])
+        self.assertEqual({r["status"] for r in results}, {"ok"})
+
+        results = batch_convert(input_dir, output_dir, ".csv", ".json", workers=1, recursive=True, include=["a/*"])
+        self.assertEqual(len(results), 2)
+
+    def test_batch_convert_incremental(self):
+        input_dir = os.path.join(self.temp_dir, "input")
+        output_dir = os.path.join(self.temp_dir, "output")
+        manifest = os.path.join(self.temp_dir, "manifest.json")
+        os.mkdir(input_dir)
+        os.mkdir(output_dir)
+        for i in range(3):
+            with open(os.path.join(input_dir, f"test{i}.csv"), 'w') as f:
+                f.write(f"A,B\n{i},4\n")
+
+        def statuses(**kwargs):
+            results = batch_convert(input_dir, output_dir, ".csv", ".json", workers=1, manifest=manifest, **kwargs)
+            return {os.path.basename(r["input"]): r["status"] for r in results}
+
+        self.assertEqual(set(statuses().values()), {"ok"})
+        self.assertEqual(set(statuses().values()), {"skipped"})
+
+        # Touched but identical content is still skipped; real edits are not.
+        os.utime(os.path.join(input_dir, "test0.csv"), (0, 0))
+        with open(os.path.join(input_dir, "test1.csv"), 'w') as f:
+            f.write("A,B\n9,9\n")
+        self.assertEqual(statuses(), {"test0.csv": "skipped", "test1.csv": "ok", "test2.csv": "skipped"})
+
+        os.remove(os.path.join(output_dir, "test2.json"))
+        self.assertEqual(statuses()["test2.csv"], "ok")
+
+        self.assertEqual(statuses(chunksize=100)["test0.csv"], "ok")
+
+        os.remove(os.path.join(input_dir, "test0.csv"))
+        self.assertNotIn("test0.csv", statuses(chunksize=100))
+        self.assertTrue(os.path.exists(os.path.join(output_dir, "test0.json")))
+        self.assertEqual(statuses(chunksize=100, prune=True)["test0.csv"], "pruned")
+        self.assertFalse(os.path.exists(os.path.join(output_dir, "test0.json")))
+
+        # Inputs filtered out of a run are not orphans.
+        self.assertEqual(statuses(chunksize=100, prune=True, include=["test1.csv"]), {"test1.csv": "skipped"})
+        self.assertTrue(os.path.exists(os.path.join(output_dir, "test2.json")))
+        self.assertEqual(statuses(chunksize=100)["test2.csv"], "skipped")
+
+    def test_import_is_lazy(self):
+        code = (
+            "import sys, fileconvert\n"
+            "heavy = {'pandas', 'fitz', 'PIL', 'moviepy', 'pdf2docx', 'py7zr'}\n"
+            "sys.exit(len(heavy & set(sys.modules)))"
+        )
+        here = os.path.dirname(os.path.abspath(__file__))
+        self.assertEqual(subprocess.run([sys.executable, "-c", code], cwd=here).returncode, 0)
+
+    def test_converter_registry_prefers_lowest_cost(self):
+        calls = []
+        self.addCleanup(_CONVERTERS.pop, (".foo", ".bar"), None)
+        register_converter(".foo", ".bar", lambda i, o: calls.append("slow"), cost=50)
+        register_converter(".foo", ".bar", lambda i, o: calls.append("fast"), cost=5)
+        register_converter(".foo", ".bar", lambda i, o: calls.append("missing"), "no-such-backend", cost=1)
+        register_converter(".foo", ".bar", lambda i, o, level=0: calls.append(level), cost=20)
+        self.assertIn(".bar", get_supported_conversions("foo"))
+
+        with unittest.mock.patch.dict("fileconvert._BACKENDS", {"no-such-backend": lambda: False}):
+            backend_available.cache_clear()
+            convert_file("in.foo", "out.bar")
+            # Converters that can't take the options are passed over.
+            convert_file("in.foo", "out.bar", level=3)
+        backend_available.cache_clear()
+        self.assertEqual(calls, ["fast", 3])
+
+        # Streaming CSV <-> NDJSON beats the whole-file pandas path unless an
+        # option only the latter understands is given.
+        self.assertIs(find_converter(".csv", ".ndjson")["func"], csv_to_ndjson)
+        self.assertIs(find_converter(".jsonl", ".csv")["func"], json_to_csv)
+        self.assertIs(find_converter(".csv", ".ndjson", {"chunksize": 10})["func"], convert_data_format)
+        # CSV <-> JSON keeps pandas' typed values by default.
+        self.assertIs(find_converter(".csv", ".json")["func"], convert_data_format)
+
+    def test_convert_file_unsupported(self):
+        with self.assertRaises(ValueError):
+            convert_file("in.foo", "out.unknown")
+
+    def test_cli(self):
+        import contextlib
+        import io
+        import json
+        input_file = os.path.join(self.temp_dir, "test.csv")
+        with open(input_file, 'w') as f:
+            f.write("A,B\n1,4\n")
+        job_file = os.path.join(self.temp_dir, "jobs.csv")
+        with open(job_file, 'w') as f:
+            f.write("input,output\n")
+            f.write(f"{input_file},{os.path.join(self.temp_dir, 'test.bad')}\n")
+            f.write(f"{input_file},{os.path.join(self.temp_dir, 'test.yaml')}\n")
+
+        def run(*argv):
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                code = main(["convert", "-q", "--jobs", "1", "--format", "json", *argv])
+            return code, json.loads(stdout.getvalue())
+
+        code, report = run("--job-file", job_file)
+        self.assertEqual((code, len(report["results"])), (1, 1))
+        code, report = run("--job-file", job_file, "--continue-on-error")
+        self.assertEqual([r["status"] for r in report["results"]], ["failed", "ok"])
+        self.assertEqual(report["summary"][".csv->.yaml"]["count"], 1)
+
+        # Unreadable job lines fail on their own instead of ending the run.
+        jsonl_file = os.path.join(self.temp_dir, "jobs.jsonl")
+        with open(jsonl_file, 'w') as f:
+            f.write("{not json\n")
+            f.write(json.dumps({"output": "x.json"}) + "\n")
+            f.write(json.dumps({"input": input_file, "output": os.path.join(self.temp_dir, "line.json")}) + "\n")
+        code, report = run("--job-file", jsonl_file, "--continue-on-error")
+        self.assertEqual([r["status"] for r in report["results"]], ["failed", "failed", "ok"])
+        self.assertIn("jobs.jsonl:2: missing 'input'", report["results"][1]["error"])
+        code, report = run("--job-file", jsonl_file)
+        self.assertEqual((code, len(report["results"])), (1, 1))
+
+        # A single conversion doesn't start a process pool.
+        with unittest.mock.patch("fileconvert.ProcessPoolExecutor") as pool, \
+                contextlib.redirect_stdout(io.StringIO()):
+            code = main(["convert", "-q", input_file, "--to", "json", "-o", self.temp_dir])
+        pool.assert_not_called()
+        self.assertEqual(code, 0)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "test.json")))
+
+    def test_daemon(self):
+        import threading
+        import time
+        address = os.path.join(self.temp_dir, "daemon.sock")
+        server = threading.Thread(target=serve, args=(address,), kwargs={"workers": 1, "max_queue": 2, "preimports": ()})
+        server.start()
+        try:
+            for _ in range(100):
+                try:
+                    stats = daemon_request(address, op="stats")
+                    break
+                except OSError:
+                    time.sleep(0.1)
+            self.assertEqual(stats["workers"], 1)
+
+            input_file = os.path.join(self.temp_dir, "test.csv")
+            with open(input_file, 'w') as f:
+                f.write("A,B\n1,4\n")
+            output_file = os.path.join(self.temp_dir, "test.json")
+            response = daemon_request(address, op="submit", input=input_file, output=output_file, wait=True)
+            self.assertTrue(response["ok"])
+            self.assertEqual(response["job"]["status"], "ok")
+            self.assertTrue(os.path.exists(output_file))
+
+            bad_output = os.path.join(self.temp_dir, "test.bad")
+            response = daemon_request(address, op="submit", input=input_file, output=bad_output)
+            job = daemon_request(address, op="wait", id=response["job"]["id"], timeout=30)["job"]
+            self.assertEqual(job["status"], "failed")
+            self.assertFalse(daemon_request(address, op="status", id="missing")["ok"])
+            self.assertEqual(daemon_request(address, op="stats")["completed"], 1)
+
+            # A killed worker breaks the pool; the daemon replaces it and
+            # keeps serving.
+            import psutil
+            import signal
+            for child in psutil.Process().children():
+                os.kill(child.pid, signal.SIGKILL)
+            # A job that raced the kill may fail with it; later ones must not.
+            for expected in (("ok", "failed"), ("ok",)):
+                response = daemon_request(address, op="submit", input=input_file, output=output_file, wait=True)
+                self.assertIn(response["job"]["status"], expected)
+        finally:
+            daemon_request(address, op="shutdown")
+            server.join(30)
+        self.assertFalse(os.path.exists(address))
+
+    def test_conversion_metrics(self):
+        input_file = os.path.join(self.temp_dir, "test.csv")
+        with open(input_file, 'w') as f:
+            f.write("A,B\n1,4\n2,5\n")
+        records = []
+        add_metrics_hook(records.append)
+        self.addCleanup(remove_metrics_hook, records.append)
+
+        output_file = os.path.join(self.temp_dir, "test.json")
+        record = convert_file(input_file, output_file, metrics=True, profile="cprofile")
+        self.assertEqual(records, [record])
+        self.assertEqual((record["pair"], record["backend"], record["status"]), (".csv->.json", "pandas", "ok"))
+        self.assertEqual(record["input_bytes"], os.path.getsize(input_file))
+        self.assertEqual(record["output_bytes"], os.path.getsize(output_file))
+        self.assertGreater(record["peak_rss"], 0)
+        self.assertIn("convert_data_format", record["profile"])
+
+        with self.assertRaises(ValueError):
+            convert_file(input_file, os.path.join(self.temp_dir, "test.unknown"))
+        self.assertEqual((records[-1]["status"], records[-1]["error"]), ("failed", "ValueError"))
+
+        input_dir = os.path.join(self.temp_dir, "batch")
+        os.mkdir(input_dir)
+        for i in range(4):
+            shutil.copy(input_file, os.path.join(input_dir, f"test{i}.csv"))
+        results = batch_convert(input_dir, input_dir, ".csv", ".yaml", workers=2)
+        self.assertEqual(len(records), 6)
+        summary = summarize_metrics(results)
+        self.assertEqual(summary[".csv->.yaml"]["count"], 4)
+        self.assertLessEqual(summary[".csv->.yaml"]["wall_p50"], summary[".csv->.yaml"]["wall_p95"])
+
+    def test_conversion_cache(self):
+        cache_dir = os.path.join(self.temp_dir, "cache")
+        enable_cache(cache_dir, max_bytes=100)
+        self.addCleanup(disable_cache)
+        inputs = []
+        for i in range(3):
+            input_file = os.path.join(self.temp_dir, f"test{i}.csv")
+            with open(input_file, 'w') as f:
+                f.write(f"A,B\n{i},4\n")
+            inputs.append(input_file)
+
+        first = os.path.join(self.temp_dir, "first.json")
+        second = os.path.join(self.temp_dir, "second.json")
+        convert_file(inputs[0], first)
+        convert_file(inputs[0], second)
+        with open(first) as f, open(second) as g:
+            self.assertEqual(f.read(), g.read())
+        self.assertEqual(cache_stats()["hits"], 1)
+        self.assertEqual(cache_stats()["misses"], 1)
+
+        # second is hardlinked to the cached object; a miss onto it must not
+        # write through and corrupt that entry.
+        third = os.path.join(self.temp_dir, "third.json")
+        convert_file(inputs[1], second)
+        convert_file(inputs[0], third)
+        with open(first) as f, open(third) as g:
+            self.assertEqual(f.read(), g.read())
+
+        convert_file(inputs[0], second, chunksize=10)
+        self.assertEqual(cache_stats()["misses"], 3)
+
+        for input_file in inputs[1:]:
+            convert_file(input_file, os.path.join(self.temp_dir, "other.json"))
+        stats = cache_stats()
+        self.assertGreater(stats["evictions"], 0)
+        self.assertLessEqual(stats["size"], 100)
+
+    def test_conversion_cache_parallel_batch(self):
+        cache_dir = os.path.join(self.temp_dir, "cache")
+        input_dir = os.path.join(self.temp_dir, "input")
+        os.mkdir(input_dir)
+        for i in range(4):
+            with open(os.path.join(input_dir, f"test{i}.csv"), 'w') as f:
+                f.write(f"A,B\n{i},4\n")
+        enable_cache(cache_dir)
+        self.addCleanup(disable_cache)
+        before = cache_stats()
+
+        # Objects stored by the first run's workers are found by the second's.
+        for run in ("first", "second"):
+            results = batch_convert(input_dir, os.path.join(self.temp_dir, run), ".csv", ".json", workers=2)
+            self.assertEqual({r["status"] for r in results}, {"ok"})
+        stats = cache_stats()
+        self.assertEqual(stats["misses"] - before["misses"], 4)
+        self.assertEqual(stats["hits"] - before["hits"], 4)
+        self.assertEqual(stats["entries"], 4)
+
+        # max_bytes covers objects the workers stored.
+        limit = stats["size"] // 2
+        enable_cache(os.path.join(self.temp_dir, "small"), max_bytes=limit)
+        batch_convert(input_dir, os.path.join(self.temp_dir, "third"), ".csv", ".json", workers=2)
+        stats = cache_stats()
+        self.assertLessEqual(stats["size"], limit)
+        self.assertGreater(stats["entries"], 0)
+
+    def test_convert_file_async(self):
+        import asyncio
+        input_file = os.path.join(self.temp_dir, "test.csv")
+        output_file = os.path.join(self.temp_dir, "test.json")
+        with open(input_file, 'w') as f:
+            f.write("A,B\n1,4\n")
+        asyncio.run(convert_file_async(input_file, output_file, timeout=30))
+        self.assertTrue(os.path.exists(output_file))
+
+    def test_convert_file_async_timeout_kills_tool(self):
+        import asyncio
+        if not (shutil.which('sleep') and shutil.which('ps')):
+            self.skipTest("sleep/ps are not available. Skipping test.")
+        self.addCleanup(_CONVERTERS.pop, (".slow", ".out"), None)
+        register_converter(
+            ".slow", ".out", lambda i, o, seconds="30": None, command=lambda i, o, seconds="30": ["sleep", seconds]
+        )
+
+        async def run(**options):
+            with self.assertRaises(asyncio.TimeoutError):
+                await convert_file_async("in.slow", "out.out", timeout=0.2, **options)
+
+        # Options go to the argv builder, so they don't lose the kill either.
+        asyncio.run(run())
+        asyncio.run(run(seconds="31"))
+        processes = subprocess.run(["ps", "-eo", "args"], capture_output=True).stdout
+        self.assertNotIn(b"sleep 30", processes)
+        self.assertNotIn(b"sleep 31", processes)
+
+    def test_convert_file_async_archive_member(self):
+        import asyncio
+        import zipfile
+        self.addCleanup(_CONVERTERS.pop, (".src", ".dst"), None)
+        register_converter(".src", ".dst", shutil.copyfile, command=lambda i, o: ["cp", i, o])
+        archive = os.path.join(self.temp_dir, "b.zip")
+        with zipfile.ZipFile(archive, 'w') as zipf:
+            zipf.writestr("docs/x.src", "member")
+
+        output_file = os.path.join(self.temp_dir, "x.dst")
+        asyncio.run(convert_file_async(archive + "!/docs/x.src", output_file, timeout=30))
+        with open(output_file) as f:
+            self.assertEqual(f.read(), "member")
+
+    def _make_video(self, path, seconds=2):
+        subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-f", "lavfi", "-i", "testsrc=size=160x120:rate=10",
+             "-f", "lavfi", "-i", "sine=frequency=440", "-t", str(seconds), "-c:v", "libx264",
+             "-c:a", "aac", "-shortest", path],
+            check=True,
+        )
+
+    def test_transcode(self):
+        if not shutil.which('ffmpeg'):
+            self.skipTest("FFmpeg is not installed. Skipping test.")
+        input_file = os.path.join(self.temp_dir, "test.mp4")
+        self._make_video(input_file)
+
+        events = []
+        result = transcode(input_file, os.path.join(self.temp_dir, "test.mkv"), progress=events.append)
+        self.assertEqual(result["mode"], "copy")
+        self.assertTrue(events[-1]["done"])
+
+        output_file = os.path.join(self.temp_dir, "test.mp3")
+        result = transcode(input_file, output_file, preset="fast", threads=1)
+        self.assertEqual(result["mode"], "transcode")
+        info = probe_media(output_file)
+        self.assertEqual((info["video"], info["audio"]), (None, "mp3"))
+
+    def test_convert_file_async_media(self):
+        if not shutil.which('ffmpeg'):
+            self.skipTest("FFmpeg is not installed. Skipping test.")
+        import asyncio
+        input_file = os.path.join(self.temp_dir, "test.mp4")
+        self._make_video(input_file)
+        cache_dir = os.path.join(self.temp_dir, "cache")
+        enable_cache(cache_dir)
+        self.addCleanup(disable_cache)
+
+        # The async path runs the same remux as transcode() and shares the cache.
+        hits = cache_stats()["hits"]
+        for name in ("first.mkv", "second.mkv"):
+            output_file = os.path.join(self.temp_dir, name)
+            asyncio.run(convert_file_async(input_file, output_file, timeout=30))
+            info = probe_media(output_file)
+            self.assertEqual((info["video"], info["audio"]), ("h264", "aac"))
+        self.assertEqual(cache_stats()["hits"], hits + 1)
+
+        output_file = os.path.join(self.temp_dir, "fast.mp3")
+        asyncio.run(convert_file_async(input_file, output_file, timeout=30, preset="fast", threads=1))
+        self.assertEqual(probe_media(output_file)["audio"], "mp3")
+
+    def test_transcode_interrupted_kills_ffmpeg(self):
+        if not shutil.which('ffmpeg'):
+            self.skipTest("FFmpeg is not installed. Skipping test.")
+        import time
+        input_file = os.path.join(self.temp_dir, "long.mp4")
+        self._make_video(input_file, seconds=40)
+
+        def interrupt(event):
+            raise TimeoutError("Conversion timed out")
+
+        start = time.perf_counter()
+        with self.assertRaises(TimeoutError):
+            transcode(input_file, os.path.join(self.temp_dir, "long.webm"), progress=interrupt)
+        self.assertLess(time.perf_counter() - start, 3)
+
+    def test_extract_audio_from_video(self):
+        if not shutil.which('ffmpeg'):
+            self.skipTest("FFmpeg is not installed. Skipping test.")
+        input_file = os.path.join(self.temp_dir, "test.mp4")
+        self._make_video(input_file)
+
+        for ext in (".m4a", ".wav"):
+            output_file = os.path.join(self.temp_dir, "test" + ext)
+            extract_audio_from_video(input_file, output_file)
+            info = probe_media(output_file)
+            self.assertIsNone(info["video"])
+            self.assertEqual(info["audio"], "aac" if ext == ".m4a" else "pcm_s16le")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file